@@ -9,6 +9,8 @@ import time
 import signal
 from pathlib import Path
 
+from tests.fixtures.test_data import DEVICE_PROFILES, DEFAULT_DEVICE_PROFILE
+
 
 def start_http_server(port=8000):
     """Start HTTP server for testing."""
@@ -43,7 +45,8 @@ def start_http_server(port=8000):
 
 
 def run_tests(test_type='all', verbose=False, coverage=False, html_report=False, 
-              parallel=False, base_url=None, browser='chrome', headless=None):
+              parallel=False, base_url=None, browser='chrome', headless=None, profile=None,
+              cpu_profile=None, speed_factor=None, suite_profile=False, trace=False):
     """Run tests with specified options."""
     
     cmd = ['pytest']
@@ -83,6 +86,14 @@ def run_tests(test_type='all', verbose=False, coverage=False, html_report=False,
             '--self-contained-html'
         ])
     
+    # Suite timing: fixtures, test phases and report generation (Chrome trace)
+    if suite_profile:
+        cmd.extend(['--suite-profile', os.path.join('reports', f"suite-trace-{profile or DEFAULT_DEVICE_PROFILE}.json")])
+    
+    # Per-test Chrome traces; only failed/regressed tests keep theirs (reports/traces/)
+    if trace:
+        cmd.append('--chrome-trace')
+    
     # Parallel execution
     if parallel:
         cmd.extend(['-n', 'auto'])
@@ -99,13 +110,28 @@ def run_tests(test_type='all', verbose=False, coverage=False, html_report=False,
     if headless is not None:
         env['CI'] = 'true' if headless else 'false'
     
+    if profile:
+        env['DEVICE_PROFILE'] = profile
+    
+    if speed_factor:
+        env['PERF_SPEED_FACTOR'] = str(speed_factor)
+    
+    if cpu_profile:
+        env['CPU_PROFILE'] = str(cpu_profile)
+        # Profiles are written per session; parallel workers would overwrite each other
+        if parallel:
+            print("Note: --cpu-profile disables --parallel")
+            cmd.remove('-n')
+            cmd.remove('auto')
+    
     # Create reports directory
     Path('reports').mkdir(exist_ok=True)
     
     print(f"Running command: {' '.join(cmd)}")
     print(f"Environment: BASE_URL={env.get('BASE_URL', 'default')}, "
           f"BROWSER={env.get('BROWSER', 'chrome')}, "
-          f"CI={env.get('CI', 'false')}")
+          f"CI={env.get('CI', 'false')}, "
+          f"DEVICE_PROFILE={env.get('DEVICE_PROFILE', DEFAULT_DEVICE_PROFILE)}")
     
     try:
         result = subprocess.run(cmd, env=env)
@@ -131,6 +157,11 @@ Examples:
   python run_tests.py --type performance --headless  # Run performance tests in headless mode
   python run_tests.py --fast --parallel       # Run fast tests in parallel
   python run_tests.py --coverage --html       # Run with coverage and HTML report
+  python run_tests.py --type performance --profile kiosk-low  # Emulate a low-end kiosk
+  python run_tests.py --type performance --profile all        # Report every device profile
+  python run_tests.py --type slow --cpu-profile 500           # Soak run with a 500us CPU sampler
+  python run_tests.py --suite-profile                         # Where does suite time go?
+  python run_tests.py --type integration --server --trace     # Keep Chrome traces of failed tests
         """
     )
     
@@ -154,7 +185,7 @@ Examples:
     )
     
     parser.add_argument(
-        '--html', '-h',
+        '--html',
         action='store_true',
         help='Generate HTML test report'
     )
@@ -202,6 +233,45 @@ Examples:
         help='Force browser GUI mode (useful for debugging)'
     )
     
+    parser.add_argument(
+        '--profile',
+        choices=list(DEVICE_PROFILES) + ['all'],
+        default=None,
+        help=f'Emulated device profile (default: {DEFAULT_DEVICE_PROFILE}); '
+             'results go to reports/performance/<profile>.json'
+    )
+    
+    parser.add_argument(
+        '--cpu-profile',
+        type=int,
+        nargs='?',
+        const=1000,
+        default=None,
+        metavar='INTERVAL_US',
+        help='Sample page CPU usage with the given interval in microseconds (default: 1000); '
+             'hot spots go to reports/cpu/<profile>/'
+    )
+    
+    parser.add_argument(
+        '--speed-factor',
+        type=float,
+        default=None,
+        help='Pin the machine speed factor for time budgets instead of calibrating (1 = reference machine)'
+    )
+    
+    parser.add_argument(
+        '--suite-profile',
+        action='store_true',
+        help='Time fixtures and test phases; print top cost centers and write reports/suite-trace-<profile>.json'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='Record a Chrome performance trace per browser test; traces of failed or regressed '
+             'tests are kept in reports/traces/ with summaries in summary.json'
+    )
+    
     args = parser.parse_args()
     
     # Determine headless mode
@@ -237,18 +307,29 @@ Examples:
         signal.signal(signal.SIGINT, cleanup_server)
         signal.signal(signal.SIGTERM, cleanup_server)
     
+    profiles = list(DEVICE_PROFILES) if args.profile == 'all' else [args.profile]
+    
     try:
-        # Run tests
-        exit_code = run_tests(
-            test_type=args.type,
-            verbose=args.verbose,
-            coverage=args.coverage,
-            html_report=args.html,
-            parallel=args.parallel,
-            base_url=base_url,
-            browser=args.browser,
-            headless=headless
-        )
+        # Run tests (once per device profile)
+        exit_code = 0
+        for profile in profiles:
+            if profile:
+                print(f"\n=== Device profile: {profile} ({DEVICE_PROFILES[profile]['description']}) ===")
+            exit_code = run_tests(
+                test_type=args.type,
+                verbose=args.verbose,
+                coverage=args.coverage,
+                html_report=args.html,
+                parallel=args.parallel,
+                base_url=base_url,
+                browser=args.browser,
+                headless=headless,
+                profile=profile,
+                cpu_profile=args.cpu_profile,
+                speed_factor=args.speed_factor,
+                suite_profile=args.suite_profile,
+                trace=args.trace
+            ) or exit_code
         
         if exit_code == 0:
             print("\n✓ All tests passed!")
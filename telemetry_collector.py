@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Collector for the player's field telemetry beacons.
+
+``index.html?telemetry=<url>`` batches transition latency, time to first
+frame, failures by reason, recoveries, heap, recreations and long tasks,
+and ships them with ``navigator.sendBeacon``. This collector ingests
+those beacons, keeps hourly rollups in SQLite and answers percentile
+queries per device and per version.
+
+Samples are not stored individually: each value lands in a log-scale
+bucket (``BUCKET_BASE``, about 5% relative error) counted per device,
+version, metric and hour, so a kiosk costs a few hundred rows per day no
+matter how many videos it plays. Counters are summed the same way.
+
+Usage::
+
+    python telemetry_collector.py serve --db telemetry.db --port 8765
+    python telemetry_collector.py query --db telemetry.db --metric transition_ms --by version
+    python telemetry_collector.py counters --db telemetry.db --prefix failure. --by device
+
+HTTP API (``serve``)::
+
+    POST /beacon                                    one beacon (JSON body, any content type)
+    GET  /percentiles?metric=first_frame_ms&by=device&p=50,95,99&hours=24[&device=..&version=..]
+    GET  /counters?prefix=failure.&by=version&hours=24
+    GET  /devices
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+BUCKET_BASE = 1.05
+MAX_BEACON_BYTES = 65536
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+GROUPS = ('device', 'version')
+PRUNE_EVERY = 1000  # beacons between retention passes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    device TEXT NOT NULL, version TEXT NOT NULL, metric TEXT NOT NULL,
+    hour INTEGER NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (metric, hour, device, version, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    device TEXT NOT NULL, version TEXT NOT NULL, name TEXT NOT NULL,
+    hour INTEGER NOT NULL, total INTEGER NOT NULL,
+    PRIMARY KEY (name, hour, device, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS devices (
+    device TEXT PRIMARY KEY, version TEXT NOT NULL, session TEXT, last_seq INTEGER,
+    first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL, beacons INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class BeaconError(ValueError):
+    """Malformed beacon payload."""
+
+
+def bucket_of(value):
+    """Log-scale bucket index; values below 1 share bucket 0."""
+    return 0 if value < 1 else int(math.ceil(math.log(value) / math.log(BUCKET_BASE)))
+
+
+def bucket_value(bucket):
+    """Upper bound of a bucket (the value reported for percentiles inside it)."""
+    return 0.0 if bucket <= 0 else BUCKET_BASE ** bucket
+
+
+def _name(value, field):
+    if not isinstance(value, str) or not NAME_PATTERN.match(value):
+        raise BeaconError(f"invalid {field}: {value!r}")
+    return value
+
+
+def parse_beacon(body):
+    """Validate a beacon body (bytes or str) and return the normalized payload."""
+    if len(body) > MAX_BEACON_BYTES:
+        raise BeaconError(f"beacon larger than {MAX_BEACON_BYTES} bytes")
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise BeaconError(f"not JSON: {e}") from None
+    if not isinstance(payload, dict) or payload.get('v') != 1:
+        raise BeaconError("unsupported beacon version")
+
+    samples = {}
+    for metric, values in (payload.get('samples') or {}).items():
+        if not isinstance(values, list):
+            raise BeaconError(f"samples of {metric!r} must be a list")
+        samples[_name(metric, 'metric')] = [float(v) for v in values
+                                            if isinstance(v, (int, float)) and math.isfinite(v) and v >= 0]
+    for metric, value in (payload.get('gauges') or {}).items():
+        if isinstance(value, (int, float)) and math.isfinite(value) and value >= 0:
+            samples.setdefault(_name(metric, 'metric'), []).append(float(value))
+    counters = {}
+    for name, value in (payload.get('counters') or {}).items():
+        if isinstance(value, int) and value > 0:
+            counters[_name(name, 'counter')] = value
+
+    return {
+        'device': _name(payload.get('device'), 'device'),
+        'version': _name(payload.get('version'), 'version'),
+        'session': str(payload.get('session', ''))[:32],
+        'seq': payload.get('seq') if isinstance(payload.get('seq'), int) else None,
+        'samples': samples,
+        'counters': counters
+    }
+
+
+def percentile_from_buckets(buckets, percentile):
+    """Nearest-rank percentile over ``[(bucket, count), ...]`` sorted by bucket."""
+    total = sum(count for _, count in buckets)
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(percentile / 100 * total))
+    seen = 0
+    for bucket, count in buckets:
+        seen += count
+        if seen >= rank:
+            return bucket_value(bucket)
+    return bucket_value(buckets[-1][0])
+
+
+class TelemetryStore:
+    """SQLite rollups of telemetry beacons."""
+
+    def __init__(self, path=':memory:', retention_days=30):
+        self.retention_hours = retention_days * 24
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._ingested = 0
+
+    def close(self):
+        self._db.close()
+
+    def ingest(self, body, received_at=None):
+        """Store one beacon; ``received_at`` (epoch seconds) defaults to now. Returns the normalized payload."""
+        beacon = parse_beacon(body)
+        received_at = int(received_at if received_at is not None else time.time())
+        hour = received_at // 3600
+        key = (beacon['device'], beacon['version'])
+
+        rollup = {}
+        for metric, values in beacon['samples'].items():
+            for value in values:
+                bucket_key = (metric, bucket_of(value))
+                rollup[bucket_key] = rollup.get(bucket_key, 0) + 1
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO rollups (device, version, metric, hour, bucket, count) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (metric, hour, device, version, bucket) DO UPDATE SET count = count + excluded.count",
+                [key + (metric, hour, bucket, count) for (metric, bucket), count in rollup.items()]
+            )
+            self._db.executemany(
+                "INSERT INTO counters (device, version, name, hour, total) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (name, hour, device, version) DO UPDATE SET total = total + excluded.total",
+                [key + (name, hour, total) for name, total in beacon['counters'].items()]
+            )
+            self._db.execute(
+                "INSERT INTO devices (device, version, session, last_seq, first_seen, last_seen, beacons) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1) ON CONFLICT (device) DO UPDATE SET version = excluded.version, "
+                "session = excluded.session, last_seq = excluded.last_seq, last_seen = excluded.last_seen, "
+                "beacons = beacons + 1",
+                key + (beacon['session'], beacon['seq'], received_at, received_at)
+            )
+            self._ingested += 1
+            if self._ingested % PRUNE_EVERY == 0:
+                self._prune(hour - self.retention_hours)
+        return beacon
+
+    def _prune(self, before_hour):
+        self._db.execute("DELETE FROM rollups WHERE hour < ?", (before_hour,))
+        self._db.execute("DELETE FROM counters WHERE hour < ?", (before_hour,))
+
+    def _filters(self, hours, device, version, now):
+        clauses, params = [], []
+        if hours:
+            clauses.append("hour >= ?")
+            params.append(int((now if now is not None else time.time()) // 3600 - hours + 1))
+        for column, value in (('device', device), ('version', version)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    def percentiles(self, metric, by='device', percentiles=(50, 95, 99), hours=None, device=None, version=None,
+                    now=None):
+        """``{group: {'count': n, 'p50': value, ...}}`` for one metric grouped by device or version."""
+        if by not in GROUPS:
+            raise ValueError(f"by must be one of {GROUPS}")
+        clauses, params = self._filters(hours, device, version, now)
+        where = ' AND '.join(["metric = ?"] + clauses)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {by}, bucket, SUM(count) FROM rollups WHERE {where} GROUP BY {by}, bucket ORDER BY {by}, bucket",
+                [metric] + params
+            ).fetchall()
+        grouped = {}
+        for group, bucket, count in rows:
+            grouped.setdefault(group, []).append((bucket, count))
+        result = {}
+        for group, buckets in grouped.items():
+            summary = {'count': sum(count for _, count in buckets)}
+            for percentile in percentiles:
+                summary[f"p{percentile:g}"] = round(percentile_from_buckets(buckets, percentile), 1)
+            result[group] = summary
+        return result
+
+    def counters(self, prefix='', by='device', hours=None, device=None, version=None, now=None):
+        """``{group: {counter: total}}`` for counters starting with ``prefix``."""
+        if by not in GROUPS:
+            raise ValueError(f"by must be one of {GROUPS}")
+        clauses, params = self._filters(hours, device, version, now)
+        where = ' AND '.join(["name LIKE ? ESCAPE '\\'"] + clauses)
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {by}, name, SUM(total) FROM counters WHERE {where} GROUP BY {by}, name ORDER BY {by}, name",
+                [escaped + '%'] + params
+            ).fetchall()
+        result = {}
+        for group, name, total in rows:
+            result.setdefault(group, {})[name] = total
+        return result
+
+    def devices(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT device, version, session, last_seq, first_seen, last_seen, beacons FROM devices ORDER BY device"
+            ).fetchall()
+        columns = ('device', 'version', 'session', 'last_seq', 'first_seen', 'last_seen', 'beacons')
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Beacon ingestion and JSON queries over a shared ``TelemetryStore`` (``server.store``)."""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, GET')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') != '/beacon':
+            self._send(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BEACON_BYTES:
+            self._send(413, {'error': 'beacon too large'})
+            return
+        try:
+            self.server.store.ingest(self.rfile.read(length))
+        except BeaconError as e:
+            self._send(400, {'error': str(e)})
+            return
+        self._send(204)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        store = self.server.store
+        try:
+            hours = float(query['hours']) if 'hours' in query else None
+            by = query.get('by', 'device')
+            if url.path == '/percentiles':
+                percentiles = tuple(float(p) for p in query.get('p', '50,95,99').split(','))
+                self._send(200, store.percentiles(query['metric'], by=by, percentiles=percentiles, hours=hours,
+                                                  device=query.get('device'), version=query.get('version')))
+            elif url.path == '/counters':
+                self._send(200, store.counters(query.get('prefix', ''), by=by, hours=hours,
+                                               device=query.get('device'), version=query.get('version')))
+            elif url.path == '/devices':
+                self._send(200, store.devices())
+            else:
+                self._send(404, {'error': 'not found'})
+        except (KeyError, ValueError) as e:
+            self._send(400, {'error': f"bad query: {e}"})
+
+
+def make_server(store, host='127.0.0.1', port=8765, verbose=False):
+    """HTTP server bound to ``host:port`` (port 0 picks a free one); call ``serve_forever()``."""
+    server = ThreadingHTTPServer((host, port), CollectorHandler)
+    server.store = store
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Telemetry beacon collector for the video player")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="Receive beacons over HTTP")
+    serve.add_argument('--db', default='telemetry.db')
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--retention-days', type=int, default=30)
+    serve.add_argument('--verbose', action='store_true')
+
+    query = commands.add_parser('query', help="Percentiles of one metric")
+    query.add_argument('--db', default='telemetry.db')
+    query.add_argument('--metric', required=True)
+    query.add_argument('--by', choices=GROUPS, default='device')
+    query.add_argument('--p', default='50,95,99')
+    query.add_argument('--hours', type=float)
+
+    counters = commands.add_parser('counters', help="Counter totals (failures, recoveries, recreations...)")
+    counters.add_argument('--db', default='telemetry.db')
+    counters.add_argument('--prefix', default='')
+    counters.add_argument('--by', choices=GROUPS, default='device')
+    counters.add_argument('--hours', type=float)
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        store = TelemetryStore(args.db, retention_days=args.retention_days)
+        server = make_server(store, args.host, args.port, args.verbose)
+        print(f"Collecting beacons on http://{args.host}:{server.server_address[1]}/beacon into {args.db}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
+        return 0
+
+    store = TelemetryStore(args.db)
+    if args.command == 'query':
+        percentiles = tuple(float(p) for p in args.p.split(','))
+        result = store.percentiles(args.metric, by=args.by, percentiles=percentiles, hours=args.hours)
+    else:
+        result = store.counters(args.prefix, by=args.by, hours=args.hours)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,38 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from tests.utils.benchmark import Benchmark, benchmark_report_path, write_benchmark_report
+from tests.utils.calibration import PerformanceBudgets, calibrate
+from tests.utils.chaos import ChaosEngine
+from tests.utils.cpu_profile import CpuProfileAggregator, CpuProfileSession
+from tests.utils.device_profiles import apply_device_profile, get_device_profile
+from tests.utils.fake_player import FakePlayerPage
+from tests.utils.test_helpers import PerformanceRecorder, ReportHelpers, RoundTripCounter
+from tests.utils.trace_capture import PerTestTrace, TraceRetention
+
+# Suite timing plugin (--suite-profile). Registered here only: importing it at module level would load it
+# before pytest can rewrite its asserts, so fixtures import suite_phase lazily
+pytest_plugins = ["tests.utils.suite_profiler"]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("chrome-trace", "per-test Chrome performance traces")
+    group.addoption("--chrome-trace", action="store_true", default=False,
+                    help="Record a Chrome trace for every browser test (run_tests.py --trace)")
+    group.addoption("--trace-dir", default=os.path.join("reports", "traces"),
+                    help="Directory for traces and summary.json (default: reports/traces)")
+    group.addoption("--trace-max-mb", type=float, default=500,
+                    help="Size cap for kept traces; oldest are deleted first (default: 500)")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose phase reports as item.rep_setup / rep_call for fixture teardown."""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
 
 
 @pytest.fixture(scope="session")
@@ -19,7 +51,9 @@ def base_url():
 @pytest.fixture(scope="session")
 def chrome_driver_service():
     """Chrome driver service for selenium."""
-    service = Service(ChromeDriverManager().install())
+    from tests.utils.suite_profiler import suite_phase
+    with suite_phase("ChromeDriverManager.install"):
+        service = Service(ChromeDriverManager().install())
     yield service
     service.stop()
 
@@ -44,66 +78,123 @@ def chrome_options():
     return options
 
 
+@pytest.fixture(scope="session")
+def device_profile():
+    """Emulated hardware profile, selected with DEVICE_PROFILE (run_tests.py --profile)."""
+    return get_device_profile(os.getenv("DEVICE_PROFILE"))
+
+
+@pytest.fixture(scope="session")
+def trace_retention(request):
+    """Retention policy for --chrome-trace, or None when tracing is off."""
+    if not request.config.getoption("chrome_trace"):
+        yield None
+        return
+    retention = TraceRetention(request.config.getoption("trace_dir"),
+                               max_total_mb=request.config.getoption("trace_max_mb"))
+    yield retention
+    retention.save()
+
+
 @pytest.fixture(scope="function")
-def browser(chrome_driver_service, chrome_options):
+def browser(request, chrome_driver_service, chrome_options, device_profile, trace_retention):
     """Browser instance for tests."""
-    driver = webdriver.Chrome(service=chrome_driver_service, options=chrome_options)
+    from tests.utils.suite_profiler import suite_phase
+    with suite_phase("webdriver.Chrome"):
+        driver = webdriver.Chrome(service=chrome_driver_service, options=chrome_options)
     driver.implicitly_wait(10)
+    apply_device_profile(driver, device_profile)
+    round_trips = RoundTripCounter(driver)
+    
+    trace = None
+    if trace_retention:
+        try:
+            trace = PerTestTrace(driver, trace_retention).start()
+        except Exception as e:  # websockets missing or DevTools endpoint unavailable
+            print(f"Warning: Chrome trace disabled for this test: {e}")
+    
     yield driver
-    driver.quit()
+    
+    if trace:
+        try:
+            trace.finish(request.node)
+        except Exception as e:
+            print(f"Warning: Failed to save Chrome trace: {e}")
+    # WebDriver round trips per test, reported as a metric (user_properties / JUnit / HTML report)
+    request.node.user_properties.append(('webdriver_round_trips', round_trips.count))
+    round_trips.uninstall()
+    with suite_phase("driver.quit"):
+        driver.quit()
+
+
+@pytest.fixture(scope="session")
+def cpu_profiler(device_profile):
+    """Session-wide CPU profile aggregator, enabled with CPU_PROFILE=<interval_us> (run_tests.py --cpu-profile)."""
+    interval = os.getenv("CPU_PROFILE")
+    if not interval:
+        yield None
+        return
+    aggregator = CpuProfileAggregator(os.path.join('reports', 'cpu', device_profile['name']), int(interval))
+    yield aggregator
+    if aggregator.runs:
+        output_dir = aggregator.write_reports()
+        print(f"\n{aggregator.format_table(top=20)}\nCPU profile reports: {output_dir}")
 
 
 @pytest.fixture(scope="function")
-def loaded_page(browser, base_url):
+def loaded_page(request, browser, base_url, cpu_profiler):
     """Browser with loaded application page."""
-    browser.get(base_url)
+    from tests.utils.suite_profiler import suite_phase
+    with suite_phase("browser.get"):
+        browser.get(base_url)
+    
+    # Profiling starts once the page's renderer exists, so it covers initialization too
+    profile_session = None
+    if cpu_profiler:
+        profile_session = CpuProfileSession(browser, cpu_profiler.interval_us).start()
     
     # Wait for the page to load
     WebDriverWait(browser, 30).until(
         EC.presence_of_element_located((By.ID, "PLAYER"))
     )
     
-    # Wait longer for complete script initialization
-    time.sleep(5)
-    
-    # Ensure all critical objects exist before continuing
-    max_attempts = 10
-    for attempt in range(max_attempts):
-        try:
-            critical_check = browser.execute_script("""
-                return {
-                    hasVideos: typeof videos !== 'undefined',
-                    hasPlayer: typeof player !== 'undefined',
-                    hasPlayerSettings: typeof window.playerSettings !== 'undefined',
-                    hasRegisterFunction: typeof window.registerUserInteraction === 'function',
-                    constants: {
-                        maxVideos: window.MAX_VIDEOS_BEFORE_RECREATE,
-                        maxFailures: window.MAX_CONSECUTIVE_FAILURES,
-                        timeout: window.VIDEO_LOAD_TIMEOUT,
-                        interval: window.WATCHDOG_CHECK_INTERVAL
-                    }
-                };
-            """)
-            
-            # Check if all critical objects are ready
-            if (critical_check['hasVideos'] and critical_check['hasPlayer'] and 
-                critical_check['hasPlayerSettings'] and critical_check['hasRegisterFunction']):
-                
-                # Activate autoplay permission
-                browser.execute_script("""
-                    if (window.registerUserInteraction) {
+    # Wait for script initialization inside the page (one round trip instead of sleep + polling)
+    browser.set_script_timeout(20)
+    try:
+        with suite_phase("page init wait"):
+            ready = browser.execute_async_script("""
+                const done = arguments[arguments.length - 1];
+                const startedAt = Date.now();
+                (function check() {
+                    const ready = typeof videos !== 'undefined' && typeof player !== 'undefined' &&
+                        typeof window.playerSettings !== 'undefined' &&
+                        typeof window.registerUserInteraction === 'function';
+                    if (ready) {
+                        // Activate autoplay permission
                         window.registerUserInteraction('pytest_init');
                         console.log('pytest: autoplay activated');
+                        done(true);
+                    } else if (Date.now() - startedAt > 15000) {
+                        done(false);
+                    } else {
+                        setTimeout(check, 100);
                     }
-                """)
-                time.sleep(1)
-                break
-        except Exception as e:
-            if attempt == max_attempts - 1:
-                print(f"Warning: Failed to fully initialize after {max_attempts} attempts: {e}")
-            time.sleep(1)
+                })();
+            """)
+        if not ready:
+            print("Warning: Failed to fully initialize within 15s")
+    except TimeoutException as e:
+        print(f"Warning: Failed to fully initialize: {e}")
+    with suite_phase("loaded_page settle"):
+        time.sleep(1)
+    
+    yield browser
     
-    return browser
+    if profile_session:
+        try:
+            cpu_profiler.add(profile_session.stop(), label=request.node.nodeid)
+        except Exception as e:
+            print(f"Warning: Failed to collect CPU profile: {e}")
 
 
 @pytest.fixture(scope="function")
@@ -179,8 +270,37 @@ def video_player_helper(browser):
                 };
             """)
         
+        def get_state(self):
+            """Versioned snapshot of the whole player state (window.__playerState)."""
+            return self.driver.execute_script(
+                "return window.__playerState ? window.__playerState() : null;"
+            )
+        
+        def wait_for_state(self, predicate, timeout=30):
+            """Wait inside the page until ``predicate`` (JS expression over ``state``) holds.
+            
+            Uses a single execute_async_script call; returns the final snapshot, or
+            None when the page has no ``__waitFor`` (older deployment).
+            """
+            self.driver.set_script_timeout(timeout + 5)
+            result = self.driver.execute_async_script("""
+                const done = arguments[arguments.length - 1];
+                if (typeof window.__waitFor !== 'function') { done(null); return; }
+                window.__waitFor(arguments[0], arguments[1]).then(done);
+            """, predicate, timeout * 1000)
+            if result is None:
+                return None
+            if not result['ok']:
+                raise TimeoutException(
+                    f"Player state did not satisfy '{predicate}' within {timeout}s ({result.get('error')})"
+                )
+            return result['state']
+        
         def wait_for_video_load(self, timeout=30):
             """Wait for video to load."""
+            if self.wait_for_state("state.player && state.player.ready", timeout) is not None:
+                return
+            
             def video_loaded(driver):
                 info = self.get_current_video_info()
                 return info['player'] and info['player']['ready']
@@ -197,3 +317,124 @@ def video_player_helper(browser):
             return [log for log in logs if log['level'] in ['SEVERE', 'WARNING', 'INFO']]
     
     return VideoPlayerHelper(browser)
+
+
+@pytest.fixture(scope="function")
+def fake_player(browser, base_url):
+    """Player page driven by the local fake Plyr (see tests/utils/fake_player.py)."""
+    return FakePlayerPage(browser, base_url)
+
+
+@pytest.fixture(scope="function")
+def chaos(request, fake_player):
+    """Seeded chaos engine; the report (with the seed to replay) goes to reports/chaos/."""
+    engine = ChaosEngine(fake_player)
+    request.node.user_properties.append(("chaos_seed", engine.seed))
+    yield engine
+    if engine.results:
+        report = engine.report()
+        print(f"\n{report.format_table()}\nChaos report: {report.write()}")
+
+
+@pytest.fixture(scope="session")
+def machine_calibration(request, chrome_driver_service):
+    """Machine speed factor from a reference workload in Python and a headless browser."""
+    driver = None
+    if not os.getenv("PERF_SPEED_FACTOR"):
+        options = Options()
+        for argument in ("--headless", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"):
+            options.add_argument(argument)
+        try:
+            driver = webdriver.Chrome(service=chrome_driver_service, options=options)
+        except Exception as e:
+            print(f"Warning: browser calibration unavailable, using Python workload only: {e}")
+    try:
+        calibration = calibrate(driver)
+    finally:
+        if driver:
+            driver.quit()
+    print(f"\nMachine speed factor: {calibration['factor']} ({calibration['source']})")
+    
+    # Shown in the pytest-html environment table
+    try:
+        from pytest_metadata.plugin import metadata_key
+        request.config.stash[metadata_key]['Machine speed factor'] = calibration['factor']
+    except (ImportError, KeyError):
+        pass
+    return calibration
+
+
+@pytest.fixture(scope="session")
+def budgets(device_profile, machine_calibration):
+    """Effective performance budgets (see tests/utils/calibration.py)."""
+    return PerformanceBudgets(device_profile, machine_calibration)
+
+
+@pytest.fixture(scope="session")
+def performance_results(device_profile, budgets):
+    """Session-wide metric list, written to reports/performance/<profile>.json."""
+    results = []
+    yield results
+    if results:
+        ReportHelpers.create_performance_report(
+            results,
+            output_file=os.path.join('reports', 'performance', f"{device_profile['name']}.json"),
+            metadata={'device_profile': device_profile, 'budgets': budgets.to_dict()}
+        )
+
+
+@pytest.fixture(scope="function")
+def perf_recorder(request, budgets, performance_results):
+    """Records metrics of the current test against calibrated budgets."""
+    return PerformanceRecorder(request.node, budgets, performance_results)
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request, device_profile, budgets):
+    """Session-wide benchmark summaries, written to benchmarks/<profile>.json next to the HTML report."""
+    results = []
+    yield results
+    if results:
+        write_benchmark_report(
+            results,
+            benchmark_report_path(request.config, device_profile['name']),
+            metadata={'device_profile': device_profile, 'budgets': budgets.to_dict()}
+        )
+
+
+@pytest.fixture(scope="function")
+def benchmark(request, benchmark_results):
+    """Warmup + repeated measurement with outlier rejection (see tests/utils/benchmark.py)."""
+    return Benchmark(request.node, benchmark_results)
+
+
+@pytest.fixture(scope="function")
+def cdp(browser, base_url):
+    """Async CDP client attached to the test page (see tests/utils/cdp_client.py)."""
+    pytest.importorskip("websockets")
+    from tests.utils.cdp_client import BackgroundCDP
+
+    if not browser.current_url.startswith(base_url):
+        browser.get(base_url)
+    client = BackgroundCDP(browser, url_contains=base_url).start()
+    yield client
+    client.stop()
+
+
+@pytest.fixture
+def network_recorder(cdp):
+    """Per-transition network accounting (see tests/utils/network_recorder.py); the waterfall goes to reports/network/."""
+    from tests.utils.network_recorder import NetworkRecorder
+
+    recorder = NetworkRecorder(cdp).start()
+    yield recorder
+    recorder.stop()
+    print(f"\n{recorder.format_table()}\nNetwork report: {recorder.write()}")
+
+
+@pytest.fixture
+def heap_diff(cdp, tmp_path):
+    """Heap snapshot recorder writing to the test's tmp dir (see tests/utils/heap_diff.py)."""
+    from tests.utils.heap_diff import HeapSnapshotRecorder
+
+    return HeapSnapshotRecorder(cdp, str(tmp_path / "heap"))
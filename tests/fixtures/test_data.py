@@ -30,8 +30,7 @@ EXPECTED_CONSTANTS = {
     'MAX_CONSECUTIVE_FAILURES': 3,
     'VIDEO_LOAD_TIMEOUT': 15000,
     'WATCHDOG_CHECK_INTERVAL': 3000,
-    'MAX_STUCK_CHECKS': 3,
-    'MAX_ZERO_TIME_CHECKS': 4
+    'STALL_DEADLINE': 4000
 }
 
 # Expected JavaScript functions that should be available
@@ -57,16 +56,82 @@ EXPECTED_GLOBALS = [
     'consecutiveFailures'
 ]
 
-# Performance thresholds for testing
+# Performance thresholds for testing - the single budget file for the suite.
+# Values are for the reference machine (CALIBRATION['reference']); time-based keys
+# (SCALED_THRESHOLDS) are scaled by the measured machine factor and the device profile.
 PERFORMANCE_THRESHOLDS = {
     'page_load_timeout': 30,  # seconds
     'video_load_timeout': 20,  # seconds
     'transition_timeout': 15,  # seconds
     'max_transition_time': 25,  # seconds
+    'max_dom_manipulation_time': 10,  # seconds
     'max_initial_memory_mb': 100,  # MB
     'max_memory_growth_mb': 20,  # MB for long-running tests
     'max_watchdog_impact_mb': 5,  # MB
-    'max_heap_usage_percent': 50  # % of heap limit
+    'max_heap_usage_percent': 50,  # % of heap limit
+    'max_page_cpu_percent': 5,  # % of wall time spent in index.html functions (self time)
+    'max_input_latency_p95_ms': 200,  # ms, p95 interaction duration (INP "good" threshold)
+    'max_long_task_ms_per_recreation': 250,  # ms of long tasks per player recreation
+    'max_ready_to_first_frame_ms': 300,  # ms, median ready -> first frame (the old delay ladder: >= 500)
+    'max_first_frame_to_unmute_ms': 1000,  # ms, median first frame -> sound on (the old ladder: >= 3000)
+    'max_recovery_mttr_css_ms': 500,  # ms, mean time to restored video per recovery strategy
+    'max_recovery_mttr_iframe_ms': 3000,
+    'max_recovery_mttr_recreate_ms': 5000,
+    'max_reload_resume_ms': 4000,  # ms from checkpoint to resumed playback in the reloaded page
+    'max_soak_rss_growth_pct': 50,  # % RSS growth of the Chrome process tree between early and late soak samples
+    'max_console_burst_time': 5,  # seconds for 100 console.log calls
+    'max_response_time': 2,  # seconds for a state query right after heavy activity
+    'max_recreation_growth_mb': 10,  # MB heap growth across one player recreation
+    'max_watchdog_growth_mb': 5,  # MB heap growth while the watchdog runs
+    'max_heap_growth_per_5_recreations_mb': 2  # MB retained heap growth over 5 recreations
+}
+
+SCALED_THRESHOLDS = {
+    'page_load_timeout', 'video_load_timeout', 'transition_timeout', 'max_transition_time',
+    'max_dom_manipulation_time', 'max_input_latency_p95_ms',
+    'max_long_task_ms_per_recreation', 'max_console_burst_time', 'max_response_time',
+    'max_ready_to_first_frame_ms', 'max_first_frame_to_unmute_ms', 'max_recovery_mttr_css_ms',
+    'max_recovery_mttr_iframe_ms', 'max_recovery_mttr_recreate_ms', 'max_reload_resume_ms'
+}
+
+# Machine calibration: the same fixed workload in Python and in the browser, compared with
+# the reference machine (1 vCPU CI runner); the ratio scales SCALED_THRESHOLDS.
+CALIBRATION = {
+    'reference': {'python_ms': 200, 'browser_ms': 70},
+    'repeats': 5,
+    'min_factor': 0.5,  # Fast workstations tighten budgets at most 2x
+    'max_factor': 4.0  # Overloaded runners loosen them at most 4x
+}
+
+# Emulated hardware profiles for the performance suite (select with run_tests.py --profile).
+# Throughput is in kbit/s, latency in ms; time budgets are scaled by budget_multiplier.
+DEFAULT_DEVICE_PROFILE = 'desktop'
+
+DEVICE_PROFILES = {
+    'desktop': {
+        'description': 'CI / developer machine, no throttling',
+        'cpu_throttling_rate': 1,
+        'network': None,
+        'memory_pressure': None,
+        'window_size': (1920, 1080),
+        'budget_multiplier': 1.0
+    },
+    'kiosk-mid': {
+        'description': 'Mid-range ARM box on shared Wi-Fi',
+        'cpu_throttling_rate': 3,
+        'network': {'latency': 80, 'download_kbps': 6000, 'upload_kbps': 1500},
+        'memory_pressure': 'moderate',
+        'window_size': (1920, 1080),
+        'budget_multiplier': 1.5
+    },
+    'kiosk-low': {
+        'description': 'Low-end ARM box on congested Wi-Fi',
+        'cpu_throttling_rate': 6,
+        'network': {'latency': 250, 'download_kbps': 1500, 'upload_kbps': 400},
+        'memory_pressure': 'critical',
+        'window_size': (1280, 720),
+        'budget_multiplier': 2.5
+    }
 }
 
 # Browser compatibility test data
@@ -95,24 +160,28 @@ BROWSER_CONFIGS = {
 }
 
 # Test scenarios for error handling
+# Fault catalogue of the chaos engine (tests/utils/chaos.py). ``weight`` is the share in the seeded
+# schedule; a parameter given as a list is picked with rng.choice, a (low, high) tuple with rng.randint.
 ERROR_SCENARIOS = [
-    {
-        'name': 'invalid_video_id',
-        'script': 'currentVideo = {type: "yt", id: "invalid123"};',
-        'expected_recovery': True
-    },
-    {
-        'name': 'network_error',
-        'script': 'navigator.onLine = false;',  # Simulate offline
-        'expected_recovery': True
-    },
-    {
-        'name': 'player_error',
-        'script': 'if (player && player.emit) player.emit("error", new Error("Test error"));',
-        'expected_recovery': True
-    }
+    {'name': 'load_timeout', 'weight': 1},  # the next load never becomes ready
+    {'name': 'player_error', 'weight': 2},  # Plyr 'error' event
+    {'name': 'stall_start', 'weight': 1},  # the next video stays at currentTime=0
+    {'name': 'stall_mid', 'weight': 2},  # playback stops advancing mid-video
+    {'name': 'missing_video', 'weight': 2, 'params': {'healed_by': ['repaint', 'reload', 'recreate']}},
+    {'name': 'postmessage_flood', 'weight': 1, 'params': {'errors': (5, 40)}},
+    {'name': 'network_drop', 'weight': 1, 'params': {'duration_ms': (1000, 8000)}}
 ]
 
+CHAOS = {
+    'scenarios': 200,  # per soak session (CHAOS_SCENARIOS overrides)
+    'dwell_ms': (500, 3000),  # steady playback before the next fault
+    'sustain_ms': 1000,  # advancing, visible playback this long counts as recovered
+    'absorb_ms': 10000,  # no visible outage within this window: the fault was absorbed
+    'recovery_timeout': 45,  # seconds
+    'max_mttr_p95_ms': 20000,
+    'max_heap_growth_per_fault_mb': 2
+}
+
 # Memory test scenarios
 MEMORY_TEST_SCENARIOS = [
     {
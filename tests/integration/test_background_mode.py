@@ -0,0 +1,79 @@
+import pytest
+import time
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestBackgroundMode:
+    """Page Visibility power-saving tests driven by the local fake player."""
+
+    def _counters(self, page):
+        return page.driver.execute_script("""
+            return {
+                stall: Object.assign({}, window.stallStats),
+                visibility: Object.assign({}, window.visibilityStats),
+                loads: window.transitionStats.loads,
+                failures: window.consecutiveFailures
+            };
+        """)
+
+    def test_no_recoveries_while_hidden(self, fake_player):
+        """Test that a throttled background video causes no wakeups and no recoveries."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+        before = self._counters(page)
+
+        page.set_hidden(True)
+        page.inject('stall')  # the browser throttles background media
+        deadline = page.driver.execute_script("return window.STALL_DEADLINE;")
+        time.sleep(deadline / 1000 * 3)
+        hidden = self._counters(page)
+
+        assert page.driver.execute_script("return window.pageHidden;") is True
+        assert hidden['stall']['wakeups'] == before['stall']['wakeups'], "Watchdog should not wake up while hidden"
+        assert hidden['stall']['detections'] == before['stall']['detections'], "No stall should be reported while hidden"
+        assert hidden['visibility']['hiddenWakeups'] == 0, "Background timers should be suspended"
+        assert hidden['loads'] == before['loads'], "No video should be loaded while hidden"
+
+        page.inject('resume')
+        page.set_hidden(False)
+        probe_delay = page.driver.execute_script("return window.RESUME_PROBE_DELAY;")
+        page.wait_until("return window.visibilityStats.lastProbeResult !== null;", timeout=probe_delay / 1000 + 5)
+        after = self._counters(page)
+
+        assert after['visibility']['lastProbeResult'] == 'healthy', "Resumed playback should pass the probe"
+        assert after['visibility']['resumeProbes'] == before['visibility']['resumeProbes'] + 1
+        assert after['loads'] == before['loads'], "Healthy resume should not load a new video"
+
+    def test_stuck_after_resume_recovers_once(self, fake_player):
+        """Test that a video still stuck on return triggers exactly one recovery."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+        before = self._counters(page)
+
+        page.set_hidden(True)
+        page.inject('stall')
+        time.sleep(5)
+        page.set_hidden(False)
+
+        page.wait_until(f"return window.transitionStats.loads > {before['loads']};", timeout=15)
+        time.sleep(2)  # a burst of stale recoveries would show up here
+        after = self._counters(page)
+
+        assert after['visibility']['lastProbeResult'] == 'stuck'
+        assert after['loads'] - before['loads'] == 1, f"Expected one recovery, got {after['loads'] - before['loads']}"
+
+    def test_lifecycle_freeze_resume(self, fake_player):
+        """Test that a frozen page resumes with a probe instead of a recovery burst."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+        before = self._counters(page)
+
+        page.set_lifecycle_state('frozen')
+        time.sleep(5)
+        page.set_lifecycle_state('active')
+        time.sleep(3)
+        after = self._counters(page)
+
+        assert after['stall']['detections'] == before['stall']['detections'], "Freeze should not be reported as a stall"
+        assert after['loads'] - before['loads'] <= 1, "Resume should not trigger a burst of recoveries"
@@ -0,0 +1,44 @@
+import pytest
+
+from tests.fixtures.test_data import CHAOS, ERROR_SCENARIOS
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestChaos:
+    """Seeded fault injection against the fake player; every fault must end in recovered playback."""
+
+    def test_every_fault_type_recovers(self, chaos):
+        """Test that one scenario of each fault type is recovered or absorbed."""
+        chaos.open().page.wait_for_playing(timeout=30)
+
+        for index, scenario in enumerate(ERROR_SCENARIOS):
+            plan = {'index': index, 'fault': scenario['name'], 'dwell_ms': CHAOS['dwell_ms'][0], 'params': {
+                name: spec[0] for name, spec in scenario.get('params', {}).items()
+            }}
+            chaos.results.append(chaos.run_scenario(plan))
+
+        report = chaos.report()
+        assert not report.unrecovered, (
+            f"Unrecovered faults (seed {chaos.seed}): {[r['fault'] for r in report.unrecovered]}"
+        )
+
+    @pytest.mark.slow
+    def test_recovery_distribution(self, chaos):
+        """Test MTTR percentiles and heap growth over a seeded run (CHAOS_SCENARIOS, CHAOS_SEED)."""
+        chaos.open().page.wait_for_playing(timeout=30)
+        report = chaos.run()
+
+        assert not report.unrecovered, (
+            f"{len(report.unrecovered)} unrecovered scenarios, replay with CHAOS_SEED={chaos.seed}:\n"
+            f"{report.format_table()}"
+        )
+        for fault, stats in report.by_fault().items():
+            if stats['mttr_ms']:
+                assert stats['mttr_ms']['p95'] < CHAOS['max_mttr_p95_ms'], (
+                    f"{fault}: MTTR p95 {stats['mttr_ms']['p95']}ms over budget (seed {chaos.seed})"
+                )
+            if stats['heap_delta_mb']:
+                assert stats['heap_delta_mb']['mean'] < CHAOS['max_heap_growth_per_fault_mb'], (
+                    f"{fault}: heap grows {stats['heap_delta_mb']['mean']}MB per fault (seed {chaos.seed})"
+                )
@@ -5,6 +5,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from tests.utils.heap_diff import HeapSnapshot, diff_snapshots, format_diff, run_recreation_cycles
+
 
 @pytest.mark.integration
 @pytest.mark.browser
@@ -68,7 +70,7 @@ class TestMemoryManagement:
         
         assert recreation_occurred, f"Player should be recreated after {max_videos} videos. VideoCount: {video_count}"
     
-    def test_memory_cleanup_on_recreation(self, loaded_page, video_player_helper, memory_monitor):
+    def test_memory_cleanup_on_recreation(self, loaded_page, video_player_helper, memory_monitor, budgets):
         """Test that memory is cleaned up when player is recreated."""
         # Wait for initial video and get baseline memory
         video_player_helper.wait_for_video_load(timeout=60)
@@ -113,7 +115,7 @@ class TestMemoryManagement:
         if baseline_memory.get('usedJSHeapSize') and after_cleanup_memory.get('usedJSHeapSize'):
             memory_growth = after_cleanup_memory['usedJSHeapSize'] - baseline_memory['usedJSHeapSize']
             # Allow up to 10MB growth as reasonable
-            max_allowed_growth = 10 * 1024 * 1024  # 10MB
+            max_allowed_growth = budgets.get('max_recreation_growth_mb') * 1024 * 1024
             
             assert memory_growth < max_allowed_growth, f"Memory grew too much: {memory_growth / 1024 / 1024:.2f}MB"
     
@@ -154,7 +156,7 @@ class TestMemoryManagement:
         # (exact behavior may vary depending on cleanup implementation)
         assert final_iframes <= initial_iframes + 2, f"Too many iframes after cleanup: {final_iframes}"
     
-    def test_watchdog_memory_efficiency(self, loaded_page, video_player_helper, memory_monitor):
+    def test_watchdog_memory_efficiency(self, loaded_page, video_player_helper, memory_monitor, budgets):
         """Test that watchdog doesn't cause memory leaks."""
         # Wait for initial video
         video_player_helper.wait_for_video_load(timeout=60)
@@ -171,7 +173,7 @@ class TestMemoryManagement:
         if initial_memory.get('usedJSHeapSize') and after_watchdog_memory.get('usedJSHeapSize'):
             memory_growth = after_watchdog_memory['usedJSHeapSize'] - initial_memory['usedJSHeapSize']
             # Watchdog should not cause significant memory growth
-            max_allowed_growth = 5 * 1024 * 1024  # 5MB
+            max_allowed_growth = budgets.get('max_watchdog_growth_mb') * 1024 * 1024
             
             assert memory_growth < max_allowed_growth, f"Watchdog caused too much memory growth: {memory_growth / 1024 / 1024:.2f}MB"
     
@@ -204,7 +206,7 @@ class TestMemoryManagement:
         assert current_failures < max_failures, f"Consecutive failures not reset: {current_failures}"
     
     @pytest.mark.slow
-    def test_long_running_memory_stability(self, loaded_page, video_player_helper, memory_monitor):
+    def test_long_running_memory_stability(self, loaded_page, video_player_helper, memory_monitor, budgets):
         """Test memory stability over longer period of operation."""
         # Wait for initial video
         video_player_helper.wait_for_video_load(timeout=60)
@@ -231,6 +233,29 @@ class TestMemoryManagement:
         if baseline_memory.get('usedJSHeapSize') and final_memory.get('usedJSHeapSize'):
             memory_growth = final_memory['usedJSHeapSize'] - baseline_memory['usedJSHeapSize']
             # Over 2 minutes, memory growth should be reasonable
-            max_allowed_growth = 20 * 1024 * 1024  # 20MB for long running test
+            max_allowed_growth = budgets.get('max_memory_growth_mb') * 1024 * 1024
             
             assert memory_growth < max_allowed_growth, f"Long-running memory growth too high: {memory_growth / 1024 / 1024:.2f}MB"
+
+    def test_recreation_heap_diff(self, loaded_page, video_player_helper, heap_diff, budgets):
+        """Test that player recreation does not retain old Plyr instances or their iframes."""
+        video_player_helper.wait_for_video_load(timeout=60)
+        run_recreation_cycles(loaded_page, 1)  # warm up lazily created structures
+
+        before = HeapSnapshot.load(heap_diff.take('before'))
+        cycles = 5
+        run_recreation_cycles(loaded_page, cycles)
+        after = HeapSnapshot.load(heap_diff.take('after'))
+
+        report = diff_snapshots(before, after, top=50)
+        growth = {row['class']: row for row in report['classes']}
+
+        plyr_growth = growth.get('Plyr', {}).get('count_delta', 0)
+        iframe_growth = growth.get('HTMLIFrameElement', {}).get('count_delta', 0)
+        assert plyr_growth <= 1, f"Plyr instances leak across recreations:\n{format_diff(report)}"
+        assert iframe_growth <= 1, f"Iframes leak across recreations:\n{format_diff(report)}"
+
+        total_growth = report['total_after'] - report['total_before']
+        max_allowed_growth = budgets.get('max_heap_growth_per_5_recreations_mb') * 1024 * 1024 * cycles / 5
+        assert total_growth < max_allowed_growth, \
+            f"Heap grew by {total_growth / 1024 / 1024:.2f}MB over {cycles} recreations:\n{format_diff(report)}"
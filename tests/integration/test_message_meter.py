@@ -0,0 +1,67 @@
+import pytest
+
+
+# Listener registered by the test after the page's meter: stands in for the provider API handlers
+DOWNSTREAM_JS = """
+window.__downstream = 0;
+window.addEventListener('message', e => { if (/youtube|vimeo/.test(e.origin)) window.__downstream++; });
+"""
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestMessageMeter:
+    """postMessage traffic meter and flood damping (synthetic embed messages from the fake player)."""
+
+    def _messages(self, page):
+        return page.driver.execute_script("return window.__messages();")
+
+    def test_meter_counts_embed_traffic(self, fake_player):
+        """Test that normal embed traffic is counted per origin and per second without damping."""
+        page = fake_player.open(messageRate=4)
+        page.wait_for_playing()
+        page.wait_until("return window.__messages().perSecond.length >= 3;", timeout=15, poll=0.5)
+        report = self._messages(page)
+
+        provider_origins = {name: origin for name, origin in report['origins'].items() if name in ('youtube', 'vimeo')}
+        assert provider_origins, f"No provider traffic metered: {report['origins']}"
+        for name, origin in provider_origins.items():
+            assert origin['bytes'] > 0 and sum(origin['sizeHistogram']) == origin['count'], (name, origin)
+            assert origin['maxPerSecond'] <= 10 and not origin['flooding'], (name, origin)
+        assert report['floods'] == 0 and report['dropped'] == 0, report
+
+    def test_flood_is_damped_then_iframe_recreated(self, fake_player):
+        """Test that a flood is damped within its first second and a lasting one recreates the iframe."""
+        page = fake_player.open()
+        page.wait_for_playing()
+        page.driver.execute_script(DOWNSTREAM_JS)
+        limit = page.driver.execute_script("return window.MESSAGE_FLOOD_PER_SECOND;")
+        recreate_after_s = page.driver.execute_script("return window.MESSAGE_FLOOD_RECREATE_AFTER_MS;") / 1000
+
+        page.inject('flood', 500, 10)
+        page.wait_until("return window.__messages().recreations === 1;", timeout=recreate_after_s + 5, poll=0.2)
+        report = self._messages(page)
+        sent = page.driver.execute_script(
+            "return window.__fakePlyr.log.filter(e => e.type === 'flood_end').map(e => e.sent).pop();"
+        )
+        downstream = page.driver.execute_script("return window.__downstream;")
+
+        assert report['recentFloods'][-1]['action'] == 'recreate_iframe', report['recentFloods']
+        assert report['dropped'] > 0
+        # Every second of the flood passes at most the budget on to the provider handlers
+        assert downstream <= limit * (recreate_after_s + 3), f"{downstream} of {sent} flood messages reached handlers"
+        page.wait_for_playing()
+        assert report['skips'] == 0
+
+    def test_persistent_flood_skips_video(self, fake_player):
+        """Test that a flood surviving the iframe recreation switches to the next video."""
+        page = fake_player.open()
+        page.wait_for_playing()
+        recreate_after_s = page.driver.execute_script("return window.MESSAGE_FLOOD_RECREATE_AFTER_MS;") / 1000
+
+        page.inject('flood', 500, 3 * recreate_after_s, True)
+        page.wait_until("return window.__messages().skips >= 1;", timeout=2 * recreate_after_s + 5, poll=0.2)
+        report = self._messages(page)
+
+        assert report['recreations'] == 1, report
+        assert [f['action'] for f in report['recentFloods']][-1] == 'skip', report['recentFloods']
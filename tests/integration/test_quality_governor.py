@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestQualityGovernor:
+    """Quality cap driven by dropped frames, stalls and long tasks (fake player with a decode limit)."""
+
+    def _quality(self, page):
+        return page.driver.execute_script("return window.__quality();")
+
+    def test_steps_down_to_decodable_quality(self, fake_player):
+        """Test that dropped frames above the decode limit step the cap down and it holds there."""
+        page = fake_player.open(decodeLimit=720)
+        page.wait_for_playing()
+        window_s = page.driver.execute_script("return window.QUALITY_WINDOW_MS;") / 1000
+
+        # First window sets the baseline, the next one at 1080p drops 30% of frames
+        page.wait_until("const q = window.__quality(); return q.cap !== null && q.cap <= 720;",
+                        timeout=window_s * 4 + 10, poll=0.5)
+        quality = self._quality(page)
+        assert quality['changes'][0]['reason'] == 'dropped_frames', quality['changes']
+        assert page.driver.execute_script("return window.__fakePlyr.current().effectiveQuality;") == 720
+
+        # Calm windows at 720p, but not enough of them to try 1080p again
+        page.wait_until(f"return window.__quality().windows >= {quality['windows'] + 2};",
+                        timeout=window_s * 3 + 10, poll=0.5)
+        quality = self._quality(page)
+        assert quality['cap'] == 720 and quality['stepsDown'] == 1, quality
+        assert quality['lastSample']['dropRate'] < 0.05, quality['lastSample']
+
+    def test_wall_tiles_are_governed(self, fake_player):
+        """Test that in ?tiles=N mode the wall tick evaluates every tile and caps all of them."""
+        page = fake_player.open('tiles=3', decodeLimit=720)
+        window_s = page.driver.execute_script("return window.QUALITY_WINDOW_MS;") / 1000
+        page.wait_until("const q = window.__quality(); return q.cap !== null && q.cap <= 720;",
+                        timeout=window_s * 4 + 10, poll=0.5)
+        qualities = page.driver.execute_script(
+            "return window.__fakePlyr.instances.filter(p => !p.destroyed).map(p => p.effectiveQuality);"
+        )
+
+        assert self._quality(page)['changes'][0]['reason'] == 'dropped_frames'
+        assert len(qualities) == 3 and all(q <= 720 for q in qualities), qualities
+
+    def test_cap_survives_player_recreation(self, fake_player):
+        """Test that a start cap (?quality=480) reaches every new player through the Plyr options."""
+        page = fake_player.open('quality=480')
+        page.wait_for_playing()
+        page.driver.execute_script("window.tryFullPlayerRecreation();")
+        page.wait_until("return window.__fakePlyr.instances.length >= 2;", timeout=15)
+        page.wait_for_playing()
+        options = page.driver.execute_script("return window.__fakePlyr.current().options;")
+
+        assert options['quality']['default'] == 480
+        assert options['youtube']['vq'] == 'large' and options['vimeo']['quality'] == '480p'
+
+    def test_quality_off_leaves_provider_choice(self, fake_player):
+        """Test that ?quality=off disables the governor (the uncapped baseline)."""
+        page = fake_player.open('quality=off', decodeLimit=720)
+        page.wait_for_playing()
+        window_s = page.driver.execute_script("return window.QUALITY_WINDOW_MS;") / 1000
+        page.wait_until(f"return window.__fakePlyr.current().currentTime > {window_s * 2.5};",
+                        timeout=window_s * 3 + 10, poll=0.5)
+        quality = self._quality(page)
+
+        assert quality['enabled'] is False and quality['cap'] is None and quality['windows'] == 0
+        assert 'quality' not in page.driver.execute_script("return window.__fakePlyr.current().options;")
@@ -0,0 +1,57 @@
+import pytest
+import statistics
+import time
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestStallDetection:
+    """Event-driven watchdog tests driven by the local fake player."""
+
+    def test_stall_detection_latency(self, fake_player):
+        """Test that injected mid-video stalls are detected in well under 10 seconds."""
+        page = fake_player.open()
+        latencies = []
+
+        for attempt in range(5):
+            page.wait_for_playing(timeout=30)
+            time.sleep(1)  # let playback advance past the first ticks
+            detections_before = page.driver.execute_script("return window.stallStats.detections;")
+            page.inject('stall')
+            stalled_at = page.now()
+
+            page.wait_until(
+                f"return window.stallStats.detections > {detections_before};", timeout=30
+            )
+            detected_at = page.driver.execute_script("return window.stallStats.lastDetectedAt;")
+            latencies.append((detected_at - stalled_at) / 1000)
+
+        median_latency = statistics.median(latencies)
+        reason = page.driver.execute_script("return window.stallStats.lastReason;")
+
+        assert reason == 'watchdog_stuck', f"Mid-video stall should be reported as stuck, got {reason}"
+        assert median_latency < 10, f"Median stall detection latency too high: {median_latency:.2f}s"
+        print(f"Stall detection latency: median={median_latency:.2f}s, max={max(latencies):.2f}s")
+
+    def test_never_started_detection(self, fake_player):
+        """Test that a video frozen at currentTime=0 is detected as never started."""
+        page = fake_player.open(startStalled=True)
+
+        elapsed = page.wait_until("return window.stallStats.detections > 0;", timeout=30)
+        reason = page.driver.execute_script("return window.stallStats.lastReason;")
+
+        assert reason == 'watchdog_never_started', f"Expected never-started stall, got {reason}"
+        assert elapsed < 20, f"Never-started detection took too long: {elapsed:.2f}s"
+
+    def test_no_watchdog_wakeups_while_healthy(self, fake_player):
+        """Test that the watchdog does not poll while playback keeps progressing."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+
+        deadline = page.driver.execute_script("return window.STALL_DEADLINE;")
+        wakeups_before = page.driver.execute_script("return window.stallStats.wakeups;")
+        time.sleep(deadline / 1000 * 3)
+        stats = page.driver.execute_script("return window.stallStats;")
+
+        assert stats['wakeups'] == wakeups_before, f"Watchdog woke up {stats['wakeups'] - wakeups_before} times while healthy"
+        assert stats['detections'] == 0, "Healthy playback should not be reported as stalled"
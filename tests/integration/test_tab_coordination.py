@@ -0,0 +1,121 @@
+import pytest
+import time
+
+from tests.utils.fake_player import FakePlayerPage
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestTabCoordination:
+    """Cross-tab history/stats coordination over BroadcastChannel and Web Locks."""
+
+    def _open_windows(self, browser, base_url, count):
+        handles = []
+        for index in range(count):
+            if index > 0:
+                browser.switch_to.new_window('window')
+            FakePlayerPage(browser, base_url).open()
+            handles.append(browser.current_window_handle)
+        return handles
+
+    def test_history_consistent_across_windows(self, browser, base_url):
+        """Test that concurrent writers converge on one history with batched storage writes."""
+        browser.get(f"{base_url}/?testMode=true")
+        browser.execute_script("localStorage.clear();")
+        handles = self._open_windows(browser, base_url, 3)
+        time.sleep(2)  # leader election and initial loads
+
+        start = time.time()
+        for round_index in range(10):
+            for tab_index, handle in enumerate(handles):
+                browser.switch_to.window(handle)
+                browser.execute_script(
+                    "window.playerSettings.addToHistory(arguments[0], arguments[0]);"
+                    "window.playerSettings.recordFailure('yt');",
+                    f"tab{tab_index}-video{round_index}"
+                )
+
+        flush_delay = browser.execute_script("return window.STORAGE_FLUSH_DELAY;")
+        time.sleep(flush_delay / 1000 * 2 + 1)
+        elapsed = time.time() - start
+
+        snapshots = []
+        for handle in handles:
+            browser.switch_to.window(handle)
+            snapshots.append(browser.execute_script("""
+                return {
+                    history: window.playerSettings.watchHistory.map(item => item.id),
+                    stored: JSON.parse(localStorage.getItem('videoPlayerHistory') || '[]').map(item => item.id),
+                    failures: (window.playerSettings.providerStats.yt || {}).failures || 0,
+                    coordination: Object.assign({}, window.tabCoordination)
+                };
+            """))
+
+        roles = [snapshot['coordination']['role'] for snapshot in snapshots]
+        total_writes = sum(snapshot['coordination']['storageWrites'] for snapshot in snapshots)
+
+        assert roles.count('leader') == 1, f"Exactly one tab should own storage, got roles {roles}"
+        for snapshot in snapshots[1:]:
+            assert snapshot['history'] == snapshots[0]['history'], "All windows should see the same history"
+        assert snapshots[0]['stored'] == snapshots[0]['history'], "Persisted history should match the in-memory one"
+        for tab_index in range(3):
+            assert f"tab{tab_index}-video9" in snapshots[0]['history'], f"History from tab {tab_index} is missing"
+        assert all(snapshot['failures'] >= 30 for snapshot in snapshots), "Failure deltas should reach every window"
+
+        # 60 logical updates; the leader writes at most two keys per flush window
+        max_writes = 2 * (elapsed * 1000 / flush_delay + 1) + 4
+        assert total_writes <= max_writes, f"Too many storage writes: {total_writes} in {elapsed:.1f}s"
+
+        for handle in handles[1:]:
+            browser.switch_to.window(handle)
+            browser.close()
+        browser.switch_to.window(handles[0])
+
+    def test_snapshot_merges_counts_for_requesting_tab(self, browser, base_url):
+        """Test that a joining tab merges the leader's snapshot without double counting, and no one else applies it."""
+        browser.get(f"{base_url}/?testMode=true")
+        browser.execute_script("localStorage.clear();")
+        handles = self._open_windows(browser, base_url, 1)
+        time.sleep(2)  # leader election
+        browser.execute_script("""
+            for (let i = 0; i < 5; i++) window.playerSettings.recordFailure('yt');
+            window.playerSettings.recordRecovery('yt/chrome', 'repaint', true, 100);
+        """)
+        # The counts are persisted, so the joining tab loads them from storage and gets them in the snapshot too
+        flush_delay = browser.execute_script("return window.STORAGE_FLUSH_DELAY;")
+        time.sleep(flush_delay / 1000 * 2 + 1)
+
+        counts_script = """
+            const stats = window.playerSettings.providerStats.yt || {};
+            const recovery = (window.playerSettings.recoveryStats['yt/chrome'] || {}).repaint || {};
+            return { failures: stats.failures || 0, attempts: recovery.attempts || 0, role: window.tabCoordination.role };
+        """
+        browser.switch_to.new_window('window')
+        FakePlayerPage(browser, base_url).open()
+        handles.append(browser.current_window_handle)
+        time.sleep(2)  # hello -> snapshot
+        joined = browser.execute_script(counts_script)
+        assert joined == {'failures': 5, 'attempts': 1, 'role': 'follower'}, f"Snapshot should merge, not add: {joined}"
+
+        # A snapshot addressed to a third tab must not be applied by the second one
+        browser.execute_script("""
+            window.__merges = 0;
+            const merge = window.playerSettings.mergeCounts.bind(window.playerSettings);
+            window.playerSettings.mergeCounts = (target, source) => { window.__merges++; merge(target, source); };
+        """)
+        browser.switch_to.new_window('window')
+        FakePlayerPage(browser, base_url).open()
+        handles.append(browser.current_window_handle)
+        time.sleep(2)
+        third = browser.execute_script(counts_script)
+        browser.switch_to.window(handles[1])
+        assert browser.execute_script("return window.__merges;") == 0, "Only the requesting tab applies a snapshot"
+        assert third['failures'] == 5 and third['attempts'] == 1, third
+        browser.switch_to.window(handles[0])
+        leader = browser.execute_script(counts_script)
+        assert leader == {'failures': 5, 'attempts': 1, 'role': 'leader'}, leader
+
+        for handle in handles[1:]:
+            browser.switch_to.window(handle)
+            browser.close()
+        browser.switch_to.window(handles[0])
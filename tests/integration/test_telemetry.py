@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from telemetry_collector import TelemetryStore, make_server
+
+
+@pytest.fixture
+def collector():
+    """Local telemetry collector on a free port; yields ``(store, beacon_url)``."""
+    store = TelemetryStore()
+    server = make_server(store, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield store, f"http://127.0.0.1:{server.server_address[1]}/beacon"
+    server.shutdown()
+    server.server_close()
+    store.close()
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestTelemetryBeacons:
+    """sendBeacon telemetry from the page into the local collector (fake player)."""
+
+    def test_beacons_reach_collector(self, fake_player, collector):
+        """Test that transitions, first frames and failures arrive as per-device rollups."""
+        store, url = collector
+        page = fake_player.open(f"telemetry={url}&device=kiosk-test")
+        page.wait_for_playing()
+        page.inject('error', 'Injected telemetry error')
+        page.wait_for_playing()
+        page.driver.execute_script("window.flushTelemetry('test');")
+        page.wait_until("return window.__telemetry().sent >= 1;", timeout=10)
+        report = page.driver.execute_script("return window.__telemetry();")
+        assert report['enabled'] and report['rejected'] == 0, report
+
+        # Beacon delivery is asynchronous
+        deadline = time.time() + 10
+        while not store.devices() and time.time() < deadline:
+            time.sleep(0.1)
+        devices = store.devices()
+        assert [d['device'] for d in devices] == ['kiosk-test'], devices
+
+        latency = store.percentiles('transition_ms', by='device')
+        assert latency['kiosk-test']['count'] >= 1
+        assert store.percentiles('first_frame_ms', by='version')
+        failures = store.counters('failure.', by='device')['kiosk-test']
+        assert failures.get('failure.player_error') == 1, failures
+
+    def test_video_wall_flushes_from_its_tick(self, fake_player, collector):
+        """Test that ?tiles=N sends interval beacons with every tile's load and first-frame times."""
+        store, url = collector
+        page = fake_player.open(f"tiles=3&telemetry={url}&device=wall-test")
+        flush_s = page.driver.execute_script("return window.TELEMETRY_FLUSH_MS;") / 1000
+        page.wait_until("return window.__telemetry().sent >= 1;", timeout=flush_s * 2 + 10, poll=0.5)
+
+        deadline = time.time() + 10
+        while not store.devices() and time.time() < deadline:
+            time.sleep(0.1)
+        assert store.percentiles('transition_ms', by='device')['wall-test']['count'] == 3
+        assert store.percentiles('first_frame_ms', by='device')['wall-test']['count'] == 3
+
+    def test_sampled_out_session_sends_nothing(self, fake_player, collector):
+        """Test that ?telemetrySample=0 disables collection and beacons entirely."""
+        store, url = collector
+        page = fake_player.open(f"telemetry={url}&telemetrySample=0")
+        page.wait_for_playing()
+        assert page.driver.execute_script("return window.flushTelemetry('test');") is False
+        assert page.driver.execute_script("return window.__telemetry().enabled;") is False
+        assert store.devices() == []
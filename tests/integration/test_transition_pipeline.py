@@ -0,0 +1,70 @@
+import pytest
+import time
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestTransitionPipeline:
+    """Latest-wins transition pipeline tests driven by the local fake player."""
+
+    def test_rapid_arrow_right_coalesces(self, fake_player, memory_monitor):
+        """Test that 50 rapid ArrowRight presses settle on exactly one load."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+        memory_monitor.start_monitoring()
+
+        stats_before = page.driver.execute_script("return Object.assign({}, window.transitionStats);")
+        sources_before = page.driver.execute_script(
+            "return window.__fakePlyr.log.filter(e => e.type === 'source').length;"
+        )
+
+        body = page.driver.find_element(By.TAG_NAME, "body")
+        actions = ActionChains(page.driver)
+        for _ in range(50):
+            actions.send_keys_to_element(body, Keys.ARROW_RIGHT)
+        actions.perform()
+
+        page.wait_until("return !window.transitionState.loadPending;", timeout=10)
+        page.wait_for_playing(timeout=30)
+        time.sleep(1)  # let any stale callbacks fire if they were not cancelled
+
+        stats = page.driver.execute_script("return Object.assign({}, window.transitionStats);")
+        sources = page.driver.execute_script(
+            "return window.__fakePlyr.log.filter(e => e.type === 'source').length;"
+        )
+        players = page.driver.execute_script("""
+            const log = window.__fakePlyr.log;
+            return { created: log.filter(e => e.type === 'create').length,
+                     destroyed: log.filter(e => e.type === 'destroy').length,
+                     alive: window.__fakePlyr.instances.filter(p => !p.destroyed).length };
+        """)
+        memory_diff = memory_monitor.get_memory_diff()
+
+        assert stats['requested'] - stats_before['requested'] == 50, "Every keypress should be counted as a request"
+        assert stats['loads'] - stats_before['loads'] == 1, \
+            f"Burst should settle on one load, got {stats['loads'] - stats_before['loads']}"
+        assert sources - sources_before == 1, "Player source should be set once for the whole burst"
+        assert players['alive'] == 1, f"Burst should leave exactly one live player: {players}"
+        assert players['created'] - players['destroyed'] == 1, f"Every replaced player must be destroyed: {players}"
+        if memory_diff:
+            growth_mb = memory_diff['used_heap_size_diff'] / 1024 / 1024
+            assert growth_mb < 20, f"Heap grew too much during burst: {growth_mb:.2f}MB"
+
+    def test_stale_recovery_cancelled_by_user_transition(self, fake_player):
+        """Test that a pending failure recovery does not fire after a manual skip."""
+        page = fake_player.open()
+        page.wait_for_playing(timeout=30)
+
+        page.inject('error', 'Injected failure')
+        page.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ARROW_RIGHT)
+
+        page.wait_until("return !window.transitionState.loadPending;", timeout=10)
+        page.wait_for_playing(timeout=30)
+        loads_settled = page.driver.execute_script("return window.transitionStats.loads;")
+        time.sleep(3)  # longer than the failure recovery delay
+        loads_after = page.driver.execute_script("return window.transitionStats.loads;")
+
+        assert loads_after == loads_settled, "Cancelled recovery should not load another video"
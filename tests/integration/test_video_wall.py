@@ -0,0 +1,63 @@
+import pytest
+
+
+TILES = 4
+
+
+@pytest.mark.integration
+@pytest.mark.browser
+class TestVideoWall:
+    """?tiles=N: one page, N fake players, shared sampler and admission control."""
+
+    def _wall(self, page):
+        return page.driver.execute_script("return window.__wall();")
+
+    def _wait_all_playing(self, page, timeout=30):
+        page.wait_until(
+            "const w = window.__wall(); return w.tiles.every(t => t.state === 'playing' && t.currentTime > 0);",
+            timeout=timeout
+        )
+
+    def test_tiles_start_within_load_budget(self, fake_player):
+        """Test that startup never exceeds the concurrent load limit and tiles show distinct videos."""
+        page = fake_player.open(f"tiles={TILES}", loadLatency={'youtube': 800, 'vimeo': 800})
+        self._wait_all_playing(page)
+        wall = self._wall(page)
+        limit = page.driver.execute_script("return window.WALL_MAX_CONCURRENT_LOADS;")
+
+        assert len(wall['tiles']) == TILES
+        assert len({tile['id'] for tile in wall['tiles']}) == TILES, f"Duplicate videos on the wall: {wall['tiles']}"
+        assert wall['admission']['load']['maxActive'] <= limit, f"Load budget exceeded: {wall['admission']}"
+        assert wall['admission']['load']['queued'] >= TILES - limit, "Startup loads should have been queued"
+        assert wall['admission']['recreate']['maxActive'] <= 1
+        assert page.driver.execute_script("return window.player;") is None, "Single-player mode must stay off"
+
+    def test_failed_tile_advances_alone(self, fake_player):
+        """Test that a player error on one tile replaces its video without touching the others."""
+        page = fake_player.open(f"tiles={TILES}")
+        self._wait_all_playing(page)
+        before = self._wall(page)['tiles']
+
+        page.driver.execute_script(
+            "window.__fakePlyr.instances[1].emit('error', { message: 'Injected tile error', name: 'MediaError' });"
+        )
+        page.wait_until("const t = window.__wall().tiles[1]; return t.failures === 1 && t.state === 'playing';",
+                        timeout=30)
+        after = self._wall(page)['tiles']
+
+        assert after[1]['id'] != before[1]['id'], "Failed tile should load another video"
+        for index in (0, 2, 3):
+            assert after[index]['id'] == before[index]['id'] and after[index]['loads'] == 1, (
+                f"Tile {index} should be untouched: {before[index]} -> {after[index]}"
+            )
+        assert len({tile['id'] for tile in after}) == TILES
+
+    def test_failed_player_creation_is_retried(self, fake_player):
+        """Test that a tile whose player cannot be created backs off and retries instead of stalling."""
+        page = fake_player.open(f"tiles={TILES}", createFailures=2)
+        self._wait_all_playing(page)
+        wall = self._wall(page)
+
+        assert sum(tile['failures'] for tile in wall['tiles']) == 2, f"Both creation failures should count: {wall['tiles']}"
+        assert wall['admission']['recreate']['active'] == 0, f"Recreate slot leaked: {wall['admission']}"
+        assert wall['admission']['recreate']['maxActive'] <= 1
@@ -0,0 +1,78 @@
+import pytest
+
+
+# URL flags selecting each autoplay mode of the page's state machine
+AUTOPLAY_MODES = {
+    'aggressive': '',
+    'gestureChain': 'aggressive=false',
+    'autoGrant': 'aggressive=false&gestureChain=false'
+}
+VIDEOS_PER_MODE = 5
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+class TestAutoplayLatency:
+    """ready -> first frame -> sound, measured by the page's autoplay state machine."""
+
+    def _play_videos(self, page, mode, count):
+        """Load ``count`` videos and return the page's ``__autoplay()`` report."""
+        for _ in range(count):
+            started = page.driver.execute_script("return window.autoplayStats.started;")
+            if mode == 'gestureChain':
+                # Gesture chaining needs a recent user interaction
+                page.driver.execute_script("window.registerUserInteraction('pytest_autoplay');")
+            page.driver.execute_script("window.loadNextVideo();")
+            page.wait_until(
+                f"return window.autoplayStats.started > {started} && "
+                "['playing', 'playing_muted'].includes(window.__autoplay().state);",
+                timeout=15
+            )
+        return page.driver.execute_script("return window.__autoplay();")
+
+    @pytest.mark.parametrize('mode', list(AUTOPLAY_MODES))
+    def test_ready_to_first_frame(self, fake_player, perf_recorder, mode):
+        """Test that playback starts right after ready instead of after the fixed delay ladder."""
+        page = fake_player.open(AUTOPLAY_MODES[mode])
+        page.wait_for_playing()
+        report = self._play_videos(page, mode, VIDEOS_PER_MODE)
+
+        stats = report['byMode'][mode]
+        assert stats['blocked'] == 0, f"Autoplay blocked in {mode} mode: {report['stats']}"
+        latency = stats['readyToFirstFrame']
+        # A player recreation breaks the gesture chain, so one video may fall back to autoGrant
+        assert latency['count'] >= VIDEOS_PER_MODE - 1, f"Missing samples: {report['byMode']}"
+        perf_recorder.record(f"{mode}_ready_to_first_frame_median", latency['median'], unit='ms')
+        perf_recorder.record(f"{mode}_ready_to_first_frame_p95", latency['p95'], unit='ms')
+
+        budget = perf_recorder.budget('max_ready_to_first_frame_ms')
+        assert latency['median'] < budget, \
+            f"{mode}: ready -> first frame median {latency['median']}ms exceeds {budget:.0f}ms ({latency})"
+
+    def test_first_frame_to_unmute(self, fake_player, perf_recorder):
+        """Test that aggressive mode turns the sound on at the next timeupdate, not seconds later."""
+        page = fake_player.open(AUTOPLAY_MODES['aggressive'])
+        page.wait_for_playing()
+        report = self._play_videos(page, 'aggressive', VIDEOS_PER_MODE)
+
+        latency = report['byMode']['aggressive']['firstFrameToUnmute']
+        assert latency['count'] >= VIDEOS_PER_MODE, f"Sound was not enabled: {report['stats']}"
+        perf_recorder.record('aggressive_first_frame_to_unmute_median', latency['median'], unit='ms')
+
+        budget = perf_recorder.budget('max_first_frame_to_unmute_ms')
+        assert latency['median'] < budget, \
+            f"first frame -> unmute median {latency['median']}ms exceeds {budget:.0f}ms ({latency})"
+
+    def test_blocked_sound_falls_back_to_muted(self, fake_player, perf_recorder):
+        """Test that a rejected play() with sound retries muted immediately, without waiting seconds."""
+        page = fake_player.open(AUTOPLAY_MODES['autoGrant'], autoplayBlocked=True)
+        page.wait_for_playing()
+        report = self._play_videos(page, 'autoGrant', 3)
+
+        assert report['stats']['mutedFallbacks'] >= 3, f"Muted fallback not used: {report['stats']}"
+        assert report['state'] == 'playing_muted'
+        latency = report['byMode']['autoGrant']['readyToFirstFrame']
+        perf_recorder.record('muted_fallback_ready_to_first_frame_median', latency['median'], unit='ms')
+        budget = perf_recorder.budget('max_ready_to_first_frame_ms')
+        assert latency['median'] < budget, \
+            f"Muted fallback median {latency['median']}ms exceeds {budget:.0f}ms ({latency})"
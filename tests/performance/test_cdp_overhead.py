@@ -0,0 +1,62 @@
+import pytest
+import statistics
+import time
+
+
+SAMPLE_EXPRESSION = "performance.memory ? performance.memory.usedJSHeapSize : 0"
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+class TestCDPOverhead:
+    """Per-sample cost of WebDriver round trips versus the async CDP client."""
+
+    SAMPLES = 200
+
+    def _per_sample_ms(self, sample, batches=5):
+        timings = []
+        for _ in range(batches):
+            start = time.perf_counter()
+            sample()
+            timings.append((time.perf_counter() - start) * 1000 / self.SAMPLES)
+        return statistics.median(timings)
+
+    def test_sampling_overhead(self, loaded_page, cdp, perf_recorder):
+        """Test that CDP sampling is cheaper per sample than execute_script."""
+        script = f"return {SAMPLE_EXPRESSION};"
+
+        webdriver_ms = self._per_sample_ms(
+            lambda: [loaded_page.execute_script(script) for _ in range(self.SAMPLES)]
+        )
+        cdp_ms = self._per_sample_ms(
+            lambda: [cdp.evaluate(SAMPLE_EXPRESSION) for _ in range(self.SAMPLES)]
+        )
+        batched_ms = self._per_sample_ms(
+            lambda: cdp.evaluate_many([SAMPLE_EXPRESSION] * self.SAMPLES)
+        )
+
+        perf_recorder.record('execute_script_per_sample', webdriver_ms, unit='ms')
+        perf_recorder.record('cdp_evaluate_per_sample', cdp_ms, unit='ms')
+        perf_recorder.record('cdp_batched_per_sample', batched_ms, unit='ms')
+
+        assert batched_ms < webdriver_ms, \
+            f"Batched CDP sampling ({batched_ms:.3f}ms) should beat execute_script ({webdriver_ms:.3f}ms)"
+        assert cdp_ms < webdriver_ms * 1.5, \
+            f"Single CDP evaluate ({cdp_ms:.3f}ms) should be comparable to execute_script ({webdriver_ms:.3f}ms)"
+
+    def test_concurrent_subscriptions(self, loaded_page, cdp):
+        """Test that console, network and performance events stream while sampling memory."""
+        cdp.subscribe('Runtime.consoleAPICalled', 'Network.requestWillBeSent',
+                      domains=('Runtime', 'Network', 'Performance'))
+
+        loaded_page.execute_script("console.log('cdp subscription probe'); fetch(location.href);")
+        samples = cdp.sample(SAMPLE_EXPRESSION, interval=0.02, duration=1.0)
+        metrics = cdp.send('Performance.getMetrics')
+
+        console_messages = [
+            event['args'][0].get('value') for event in cdp.events['Runtime.consoleAPICalled'] if event.get('args')
+        ]
+        assert 'cdp subscription probe' in console_messages, "Console events should be delivered"
+        assert len(cdp.events['Network.requestWillBeSent']) > 0, "Network events should be delivered"
+        assert len(samples) >= 20, f"Expected high-rate memory sampling, got {len(samples)} samples/s"
+        assert any(metric['name'] == 'JSHeapUsedSize' for metric in metrics['metrics'])
@@ -0,0 +1,96 @@
+import json
+import os
+import statistics
+import time
+
+import pytest
+
+from tests.utils.test_helpers import MemoryTestHelpers
+
+
+SOAK_SAMPLE_INTERVAL = 60  # seconds between heap/RSS samples
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+class TestCheckpointReload:
+    """Checkpoint-and-reload: resume latency and memory over a multi-hour run."""
+
+    def _state(self, driver):
+        return driver.execute_script("""
+            const state = window.__playerState ? window.__playerState() : null;
+            return state && {
+                id: state.video.id,
+                currentTime: state.player ? state.player.currentTime : 0,
+                heap: state.memory ? state.memory.usedJSHeapSize : null,
+                reload: window.reloadStats ? Object.assign({}, window.reloadStats) : null
+            };
+        """)
+
+    def test_reload_resumes_same_video(self, fake_player, perf_recorder):
+        """Test that a checkpoint reload resumes the same video at the saved position."""
+        page = fake_player.open('reloadEvery=600')
+        page.wait_for_playing()
+        page.wait_until("return window.__fakePlyr.current().currentTime >= 3;", timeout=20)
+        before = self._state(page.driver)
+
+        page.driver.execute_script("window.checkpointCurrentVideo('manual');")
+        page.wait_until("return !!(window.reloadStats && window.reloadStats.resumed);", timeout=30)
+        after = self._state(page.driver)
+
+        assert after['id'] == before['id'], f"Resumed {after['id']} instead of {before['id']}"
+        assert after['reload']['reloads'] == 1 and after['reload']['lastReason'] == 'manual', after['reload']
+        assert after['currentTime'] >= before['currentTime'], f"Position lost: {before} -> {after}"
+        assert after['reload']['resumeDriftS'] < 2, f"Resumed too far from the checkpoint: {after['reload']}"
+        budget = perf_recorder.budget('max_reload_resume_ms')
+        latency = after['reload']['resumeLatencyMs']
+        perf_recorder.record('reload_resume_latency', latency, unit='ms', budget=budget)
+        assert latency < budget, f"Checkpoint to resumed playback took {latency}ms (budget {budget:.0f}ms)"
+
+    @pytest.mark.slow
+    def test_memory_soak_with_scheduled_reloads(self, browser, base_url, perf_recorder):
+        """Test that heap and RSS stay bounded over hours of real playback (SOAK_HOURS, SOAK_RELOAD_MINUTES)."""
+        hours = float(os.getenv('SOAK_HOURS', '2'))
+        reload_minutes = float(os.getenv('SOAK_RELOAD_MINUTES', '20'))
+        browser.get(f"{base_url}/?reloadEvery={reload_minutes}")
+
+        samples, latencies = [], {}
+        deadline = time.time() + hours * 3600
+        while time.time() < deadline:
+            time.sleep(SOAK_SAMPLE_INTERVAL)
+            state = self._state(browser)
+            if not state:
+                continue  # Page is reloading
+            reload = state['reload'] or {}
+            if reload.get('resumed'):
+                latencies[reload['reloads']] = reload['resumeLatencyMs']
+            samples.append({
+                'elapsed_s': round(hours * 3600 - (deadline - time.time())),
+                'heap_mb': state['heap'] / 1024 / 1024 if state['heap'] else None,
+                'rss_mb': MemoryTestHelpers.get_browser_rss_mb(browser),
+                'reloads': reload.get('reloads', 0)
+            })
+
+        os.makedirs(os.path.join('reports', 'soak'), exist_ok=True)
+        with open(os.path.join('reports', 'soak', f"soak-{int(time.time())}.json"), 'w') as report_file:
+            json.dump({'hours': hours, 'reload_minutes': reload_minutes, 'resume_latency_ms': latencies,
+                       'samples': samples}, report_file, indent=2)
+
+        reloads = samples[-1]['reloads'] if samples else 0
+        if hours * 60 >= 2 * reload_minutes:
+            assert reloads >= 1, "No scheduled reload happened during the soak"
+        for reload_number, latency in sorted(latencies.items()):
+            perf_recorder.record(f"soak_resume_latency_{reload_number}", latency, unit='ms')
+
+        # Early vs late medians: a scheduled reload must keep memory from creeping up
+        window = max(1, len(samples) // 10)
+        for key in ('rss_mb', 'heap_mb'):
+            early = [s[key] for s in samples[window:2 * window] if s[key] is not None]
+            late = [s[key] for s in samples[-window:] if s[key] is not None]
+            if not early or not late:
+                continue
+            growth = 100 * (statistics.median(late) - statistics.median(early)) / statistics.median(early)
+            perf_recorder.record(f"soak_{key}_growth", growth, unit='%')
+            if key == 'rss_mb':
+                budget = perf_recorder.budget('max_soak_rss_growth_pct')
+                assert growth < budget, f"RSS grew {growth:.0f}% over {hours}h ({reloads} reloads)"
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+
+# Swap to a video of the other provider: YouTube and Vimeo share no origins,
+# so any late byte to the old provider comes from an embed that outlived its transition
+SWAP_PROVIDER_JS = """
+const nextType = videos[currentIndex].type === 'yt' ? 'vi' : 'yt';
+currentIndex = videos.findIndex(v => v.type === nextType);
+syncWindowVariables();
+loadVideo(currentIndex);
+return nextType;
+"""
+
+RECREATE_JS = """
+const forceful = arguments[0];
+const nextType = videos[currentIndex].type === 'yt' ? 'vi' : 'yt';
+currentIndex = videos.findIndex(v => v.type === nextType);
+cleanupPlayer(forceful);
+setTimeout(() => {
+    player = createPlayer();
+    setupPlayerEvents();
+    syncWindowVariables();
+    setVideoSource(videos[currentIndex]);
+}, 600);
+return nextType;
+"""
+
+OBSERVE_S = 20
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+@pytest.mark.slow
+class TestNetworkWaterfall:
+    """Per-transition bandwidth on real embeds: no traffic may outlive the video it belongs to."""
+
+    def _wait_playing(self, browser, timeout=45):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if browser.execute_script("return !!(window.player && window.player.playing && window.player.currentTime > 1);"):
+                return
+            time.sleep(0.5)
+        pytest.skip("Embed did not start playing (no network access to the provider?)")
+
+    def _assert_old_embed_silent(self, recorder, perf_recorder, name):
+        index = len(recorder.transitions) - 1
+        transition = recorder.report()[index]
+        leaked = recorder.bytes_to_previous_origins(index)
+        stale = recorder.stale_bytes(index)
+        perf_recorder.record(f"{name}_transition_bytes", transition['bytes'] / 1024, unit='KB')
+        perf_recorder.record(f"{name}_stale_bytes", stale / 1024, unit='KB')
+
+        assert transition['marker'].get('id'), f"No source marker for the swap: {transition['marker']}"
+        assert not leaked, f"Bytes to the previous video's origins after the swap: {leaked}"
+        assert stale == 0, f"{stale} bytes from iframes of earlier transitions: {transition['stale']}"
+
+    def test_source_swap_stops_previous_embed(self, browser, network_recorder, perf_recorder):
+        """Test that after a source swap no bytes flow to the previous video's origins."""
+        self._wait_playing(browser)
+        browser.execute_script(SWAP_PROVIDER_JS)
+        self._wait_playing(browser)
+        time.sleep(OBSERVE_S)
+        self._assert_old_embed_silent(network_recorder, perf_recorder, 'swap')
+
+    @pytest.mark.parametrize("forceful", [False, True], ids=["gentle", "forceful"])
+    def test_recreation_stops_previous_embed(self, browser, network_recorder, perf_recorder, forceful):
+        """Test that player recreation (gentle: innerHTML only, forceful: about:blank) leaves no stream alive."""
+        self._wait_playing(browser)
+        browser.execute_script(RECREATE_JS, forceful)
+        self._wait_playing(browser)
+        time.sleep(OBSERVE_S)
+        self._assert_old_embed_silent(network_recorder, perf_recorder, 'forceful' if forceful else 'gentle')
@@ -0,0 +1,54 @@
+import pytest
+
+
+# Short videos keep the sampler busy: every ended video is a new pick
+VIDEO_DURATION = 5
+FAILED_PROBES = 2
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+@pytest.mark.slow
+class TestProviderCircuit:
+    """Time burned on a provider outage with the per-provider circuit breaker."""
+
+    def _circuit(self, page, provider='yt'):
+        return page.driver.execute_script("return window.__circuits()[arguments[0]];", provider)
+
+    def test_youtube_outage_wasted_time(self, fake_player, perf_recorder):
+        """Test that a YouTube outage costs the opening failures plus short probes, and that it closes again."""
+        page = fake_player.open(outage={'youtube': True}, duration=VIDEO_DURATION)
+        limits = page.driver.execute_script("""
+            return { minSamples: window.CIRCUIT_MIN_SAMPLES, probeTimeout: window.CIRCUIT_PROBE_TIMEOUT,
+                     loadTimeout: window.VIDEO_LOAD_TIMEOUT, openMs: window.CIRCUIT_OPEN_MS };
+        """)
+        started = page.now()
+
+        # Opening failures, the first cooldown, a failed probe, the doubled cooldown, another failed probe
+        worst_case_s = (limits['minSamples'] * (limits['loadTimeout'] + 2000) + 3 * limits['openMs']
+                        + FAILED_PROBES * (limits['probeTimeout'] + 2000)) / 1000
+        page.wait_until(f"return window.__circuits().yt.probeFailures >= {FAILED_PROBES};",
+                        timeout=worst_case_s + 30, poll=0.5)
+        elapsed_s = (page.now() - started) / 1000
+        circuit = self._circuit(page)
+        youtube_loads = page.driver.execute_script(
+            "return window.__fakePlyr.log.filter(e => e.type === 'source' && e.provider === 'youtube').length;"
+        )
+
+        assert circuit['state'] == 'open', f"Circuit should stay open after failed probes: {circuit}"
+        assert youtube_loads <= limits['minSamples'] + circuit['probes'], (
+            f"{youtube_loads} YouTube loads while open: only probes may reach the provider ({circuit})"
+        )
+        wasted_s = circuit['wastedMs'] / 1000
+        wasted_limit_s = (limits['minSamples'] * limits['loadTimeout']
+                          + circuit['probes'] * limits['probeTimeout']) / 1000 + 1
+        perf_recorder.record('outage_wasted', wasted_s, unit='s', budget=wasted_limit_s)
+        perf_recorder.record('outage_wasted_share', 100 * wasted_s / elapsed_s, unit='%')
+        assert wasted_s <= wasted_limit_s, f"Outage wasted {wasted_s:.1f}s of {elapsed_s:.1f}s: {circuit}"
+
+        # Provider comes back: the next probe closes the circuit and YouTube videos are picked again
+        page.inject('setOutage', 'youtube', False)
+        page.wait_until("return window.__circuits().yt.state === 'closed';",
+                        timeout=circuit['openMs'] / 1000 + 30, poll=0.5)
+        page.wait_until("return window.__circuits().yt.loads >= 2;", timeout=60, poll=0.5)
+        assert self._circuit(page)['closed'] == 1
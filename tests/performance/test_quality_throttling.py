@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+from tests.fixtures.test_data import DEVICE_PROFILES
+from tests.utils.test_helpers import MemoryTestHelpers
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+@pytest.mark.slow
+class TestQualityGovernorThrottled:
+    """Governed vs uncapped quality on real embeds under CDP CPU throttling."""
+
+    def _run(self, browser, url, minutes):
+        browser.get(url)
+        time.sleep(30)  # first load and provider quality selection
+        cpu_before = MemoryTestHelpers.get_browser_cpu_seconds(browser)
+        counters_before = self._counters(browser)
+        time.sleep(minutes * 60)
+        cpu_after = MemoryTestHelpers.get_browser_cpu_seconds(browser)
+        counters_after = self._counters(browser)
+        hours = minutes / 60
+        return {
+            'cpu_percent': 100 * (cpu_after - cpu_before) / (minutes * 60) if cpu_before is not None else None,
+            'stalls_per_hour': (counters_after['stalls'] - counters_before['stalls']) / hours,
+            'recoveries_per_hour': (counters_after['recoveries'] - counters_before['recoveries']) / hours,
+            'quality': counters_after['quality']
+        }
+
+    def _counters(self, browser):
+        return browser.execute_script("""
+            return { stalls: window.stallStats.detections, recoveries: window.transitionStats.failures,
+                     quality: window.__quality() };
+        """)
+
+    def test_governor_against_uncapped(self, browser, base_url, perf_recorder):
+        """Test that the governor does not stall or recover more than uncapped playback (QUALITY_BENCH_MINUTES)."""
+        minutes = float(os.getenv('QUALITY_BENCH_MINUTES', '10'))
+        profile = os.getenv('QUALITY_BENCH_PROFILE', 'kiosk-low')
+        rate = DEVICE_PROFILES[profile]['cpu_throttling_rate']
+        browser.execute_cdp_cmd('Emulation.setCPUThrottlingRate', {'rate': rate})
+
+        uncapped = self._run(browser, f"{base_url}/?quality=off", minutes)
+        governed = self._run(browser, base_url, minutes)
+
+        for name, result in (('uncapped', uncapped), ('governed', governed)):
+            if result['cpu_percent'] is not None:
+                perf_recorder.record(f"quality_{name}_cpu", result['cpu_percent'], unit='%')
+            perf_recorder.record(f"quality_{name}_stalls_per_hour", result['stalls_per_hour'], unit='/h')
+            perf_recorder.record(f"quality_{name}_recoveries_per_hour", result['recoveries_per_hour'], unit='/h')
+        print(f"\nCPU x{rate}: uncapped {uncapped}, governed {governed}")
+
+        assert governed['quality']['enabled'] and not uncapped['quality']['enabled']
+        assert governed['stalls_per_hour'] <= uncapped['stalls_per_hour'], (
+            f"Governor stalls more than uncapped: {governed} vs {uncapped}"
+        )
+        assert governed['recoveries_per_hour'] <= uncapped['recoveries_per_hour'], (
+            f"Governor recovers more than uncapped: {governed} vs {uncapped}"
+        )
@@ -0,0 +1,63 @@
+import pytest
+
+
+# Fake fault that each rung of the recovery ladder is able to heal
+STRATEGY_FAULTS = {'css': 'repaint', 'iframe': 'reload', 'recreate': 'recreate'}
+ROUNDS = 3
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+class TestRecoveryMTTR:
+    """Time to restored video per recovery strategy, measured by the page's recovery ladder."""
+
+    def _recover(self, page, fault, strategy=None, timeout=30):
+        """Hide the video with ``fault``, run ``strategy`` (or let the ladder detect and choose)."""
+        recovered = page.driver.execute_script("return window.recoveryStats.recovered;")
+        page.inject('hideVideo', fault)
+        if strategy:
+            page.driver.execute_script("window.runRecoveryStrategy(arguments[0]);", strategy)
+        page.wait_until(f"return window.recoveryStats.recovered > {recovered};", timeout=timeout)
+        page.wait_for_playing()
+
+    @pytest.mark.parametrize('strategy', list(STRATEGY_FAULTS))
+    def test_mean_time_to_recovery(self, fake_player, perf_recorder, strategy):
+        """Test MTTR of each strategy on a fault it can heal."""
+        page = fake_player.open()
+        page.wait_for_playing()
+        for _ in range(ROUNDS):
+            self._recover(page, STRATEGY_FAULTS[strategy], strategy)
+
+        report = page.driver.execute_script("return window.__recovery();")
+        stats = report['contexts'][report['context']][strategy]
+        assert stats['successes'] == ROUNDS, f"{strategy}: {stats}, ladder: {report['stats']}"
+        budget = perf_recorder.budget(f"max_recovery_mttr_{strategy}_ms")
+        perf_recorder.record(f"recovery_mttr_{strategy}", stats['mttrMs'], unit='ms', budget=budget)
+        assert stats['mttrMs'] < budget, f"{strategy} MTTR {stats['mttrMs']}ms exceeds {budget:.0f}ms"
+
+    def test_ladder_escalates_and_learns(self, fake_player, perf_recorder):
+        """Test that a failed rung escalates and that learned outcomes change the first choice."""
+        page = fake_player.open()
+        page.wait_for_playing()
+
+        # No prior data: the cheap CSS refresh goes first, fails on a reload-level fault and escalates
+        self._recover(page, 'reload')
+        stats = page.driver.execute_script("return window.recoveryStats;")
+        assert stats['failed'] >= 1 and stats['lastChoice']['strategy'] != 'css', f"No escalation: {stats}"
+
+        # CSS keeps failing in this context: the ladder must skip straight to a rung that works
+        page.driver.execute_script("""
+            const context = window.__recovery().context;
+            const learned = window.playerSettings.recoveryStats[context] || {};
+            learned.css = { attempts: 10, successes: 0, recoveryMs: 0, failureMs: 10000 };
+            window.playerSettings.recoveryStats[context] = learned;
+        """)
+        failed_before = stats['failed']
+        self._recover(page, 'reload')
+        report = page.driver.execute_script("return window.__recovery();")
+        assert report['stats']['failed'] == failed_before, f"Learned ranking not used: {report}"
+        assert report['ranking'][-1]['strategy'] == 'css', f"CSS should rank last: {report['ranking']}"
+
+        for strategy, learned in report['contexts'][report['context']].items():
+            if learned['mttrMs'] is not None:
+                perf_recorder.record(f"ladder_mttr_{strategy}", learned['mttrMs'], unit='ms')
@@ -0,0 +1,78 @@
+import pytest
+import time
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+
+from tests.utils.benchmark import percentile
+from tests.utils.heap_diff import run_recreation_cycles
+
+
+TRANSITION_PHASES = ('transition', 'teardown', 'create', 'loading', 'recovery')
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+class TestResponsiveness:
+    """Main-thread responsiveness from the page's PerformanceObserver buffer."""
+
+    def _report(self, driver, since):
+        time.sleep(1)  # observer callbacks are delivered after the next frame
+        return driver.execute_script("return window.__perfEntries(arguments[0]);", since)
+
+    def test_input_latency_during_transitions(self, fake_player, perf_recorder):
+        """Test p95 key press latency while transitions and recreations are running."""
+        page = fake_player.open()
+        page.wait_for_playing()
+        supported = page.driver.execute_script("return window.responsivenessStats.supported;")
+        if 'event' not in supported:
+            pytest.skip("Event Timing API is not supported by this browser")
+
+        since = page.now()
+        actions = ActionChains(page.driver)
+        for press in range(24):
+            key = Keys.SPACE if press % 4 == 3 else Keys.ARROW_RIGHT
+            actions.send_keys(key).pause(0.25)
+        actions.perform()
+        report = self._report(page.driver, since)
+
+        # One interaction = keydown + keyup; its latency is the longest of its events (as in INP)
+        interactions = {}
+        for entry in report['entries']:
+            if entry['type'] == 'event':
+                interaction = interactions.setdefault(entry['interactionId'], {'duration': 0, 'phase': entry['phase']})
+                interaction['duration'] = max(interaction['duration'], entry['duration'])
+        during_transitions = [i['duration'] for i in interactions.values() if i['phase'] in TRANSITION_PHASES]
+        latencies = during_transitions or [i['duration'] for i in interactions.values()]
+        # Entries are only emitted above EVENT_DURATION_THRESHOLD; faster key presses count as 0ms
+        latencies += [0] * max(0, 24 - len(interactions))
+
+        p95 = percentile(latencies, 95)
+        perf_recorder.record('input_latency_p95', p95, unit='ms')
+
+        budget = perf_recorder.budget('max_input_latency_p95_ms')
+        assert p95 < budget, \
+            f"p95 input latency {p95:.0f}ms exceeds {budget:.0f}ms; by phase: {report['stats']['byPhase']}"
+
+    def test_long_task_time_per_recreation(self, fake_player, perf_recorder):
+        """Test that teardown and Plyr construction do not block the main thread for long."""
+        page = fake_player.open()
+        page.wait_for_playing()
+        supported = page.driver.execute_script("return window.responsivenessStats.supported;")
+        if 'longtask' not in supported:
+            pytest.skip("Long Tasks API is not supported by this browser")
+
+        since = page.now()
+        recreations_before = page.driver.execute_script("return window.responsivenessStats.recreations;")
+        run_recreation_cycles(page.driver, 5)
+        report = self._report(page.driver, since)
+
+        recreations = report['stats']['recreations'] - recreations_before
+        assert recreations >= 5, f"Expected 5 recreations, got {recreations}"
+        long_task_ms = sum(entry['duration'] for entry in report['entries'] if entry['type'] == 'longtask')
+        per_recreation = long_task_ms / recreations
+        perf_recorder.record('long_task_ms_per_recreation', per_recreation, unit='ms')
+
+        budget = perf_recorder.budget('max_long_task_ms_per_recreation')
+        assert per_recreation < budget, \
+            f"{per_recreation:.0f}ms of long tasks per recreation (budget {budget:.0f}ms); " \
+            f"by phase: {report['stats']['byPhase']}"
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+from tests.utils.test_helpers import MemoryTestHelpers
+
+
+SETTLE_S = 45  # startup loads and first recreations
+MEASURE_S = 30
+
+
+@pytest.mark.performance
+@pytest.mark.browser
+@pytest.mark.slow
+class TestVideoWallResources:
+    """RSS and CPU of one ?tiles=N page against N independent player windows (real embeds)."""
+
+    def _measure(self, driver):
+        time.sleep(SETTLE_S)
+        cpu_before = MemoryTestHelpers.get_browser_cpu_seconds(driver)
+        time.sleep(MEASURE_S)
+        cpu_after = MemoryTestHelpers.get_browser_cpu_seconds(driver)
+        return {
+            'rss_mb': MemoryTestHelpers.get_browser_rss_mb(driver),
+            'cpu_percent': 100 * (cpu_after - cpu_before) / MEASURE_S if cpu_before is not None else None
+        }
+
+    def test_wall_against_independent_windows(self, browser, base_url, perf_recorder):
+        """Test that a video wall costs less memory than the same number of separate windows."""
+        tiles = int(os.getenv('WALL_BENCH_TILES', '4'))
+
+        # N windows (not tabs: background tabs are throttled and would look cheaper than they are)
+        main_window = browser.current_window_handle
+        browser.get(base_url)
+        for _ in range(tiles - 1):
+            browser.switch_to.new_window('window')
+            browser.get(base_url)
+        windows = self._measure(browser)
+        for handle in browser.window_handles:
+            if handle != main_window:
+                browser.switch_to.window(handle)
+                browser.close()
+        browser.switch_to.window(main_window)
+
+        browser.get(f"{base_url}/?tiles={tiles}")
+        wall = self._measure(browser)
+        report = browser.execute_script("return window.__wall();")
+
+        for name, result in (('windows', windows), ('wall', wall)):
+            perf_recorder.record(f"{name}_{tiles}_rss", result['rss_mb'], unit='MB')
+            if result['cpu_percent'] is not None:
+                perf_recorder.record(f"{name}_{tiles}_cpu", result['cpu_percent'], unit='%')
+        print(f"\n{tiles} players: windows {windows}, wall {wall}, admission {report['admission']}")
+
+        assert report['admission']['load']['maxActive'] <= report['admission']['load']['limit']
+        assert sum(1 for tile in report['tiles'] if tile['state'] == 'playing') >= tiles - 1, report['tiles']
+        if windows['rss_mb'] and wall['rss_mb']:
+            assert wall['rss_mb'] <= windows['rss_mb'], (
+                f"Wall of {tiles} uses {wall['rss_mb']:.0f}MB, {tiles} windows {windows['rss_mb']:.0f}MB"
+            )
@@ -1,9 +1,14 @@
 import pytest
 import time
+import math
+import random
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from tests.fixtures.test_data import EXPECTED_CONSTANTS
+from tests.utils.test_helpers import RoundTripCounter
+
 
 @pytest.mark.unit
 @pytest.mark.browser
@@ -265,4 +270,116 @@ class TestJavaScriptFunctions:
         assert 'error' not in result, f"Error in test: {result.get('error')}"
         assert result['initialPosition'] == 0, "Initial history position should be 0"
         assert result['canGoBack'] is True, "Should be able to go back in history"
-        assert result['historyLength'] == 3, "History should contain 3 videos"
\ No newline at end of file
+        assert result['historyLength'] == 3, "History should contain 3 videos"
+
+    def test_adaptive_load_timeout_bounds(self, loaded_page):
+        """Test that the adaptive load timeout falls back to the default and respects its bounds."""
+        result = loaded_page.execute_script("""
+            window.resetLoadLatency();
+            const initial = window.getLoadTimeout('yt');
+            for (let i = 0; i < 60; i++) window.recordLoadLatency('yt', 10);
+            for (let i = 0; i < 60; i++) window.recordLoadLatency('vi', 120000);
+            const estimate = window.loadTimeoutEstimate;
+            window.resetLoadLatency();
+            return {
+                initial: initial,
+                fast: estimate.yt.timeout,
+                slow: estimate.vi.timeout,
+                defaultTimeout: window.VIDEO_LOAD_TIMEOUT,
+                floor: window.LOAD_TIMEOUT_FLOOR,
+                ceiling: window.LOAD_TIMEOUT_CEILING
+            };
+        """)
+
+        assert result['initial'] == result['defaultTimeout'], "Without samples the default timeout should be used"
+        assert result['fast'] == result['floor'], f"Fast provider should hit the floor, got {result['fast']}"
+        assert result['slow'] == result['ceiling'], f"Slow provider should hit the ceiling, got {result['slow']}"
+
+    def test_adaptive_load_timeout_converges(self, loaded_page):
+        """Test that the per-provider load timeout converges under simulated latency distributions."""
+        rng = random.Random(26)
+        fast_network = [rng.lognormvariate(math.log(900), 0.5) for _ in range(300)]
+        slow_kiosk = [rng.uniform(12000, 17000) for _ in range(300)]
+
+        result = loaded_page.execute_script("""
+            window.resetLoadLatency();
+            arguments[0].forEach(ms => window.recordLoadLatency('yt', ms));
+            arguments[1].forEach(ms => window.recordLoadLatency('vi', ms));
+            const estimate = window.loadTimeoutEstimate;
+            window.resetLoadLatency();
+            return {
+                estimate: estimate,
+                floor: window.LOAD_TIMEOUT_FLOOR,
+                ceiling: window.LOAD_TIMEOUT_CEILING,
+                margin: window.LOAD_TIMEOUT_MARGIN
+            };
+        """, fast_network, slow_kiosk)
+
+        fast_sorted = sorted(fast_network)
+        true_p95 = fast_sorted[int(0.95 * len(fast_sorted))]
+        true_p99 = fast_sorted[int(0.99 * len(fast_sorted))]
+        yt = result['estimate']['yt']
+
+        assert abs(yt['p95'] - true_p95) / true_p95 < 0.15, f"p95 estimate {yt['p95']:.0f}ms, expected ~{true_p95:.0f}ms"
+        expected_timeout = min(result['ceiling'], max(result['floor'], true_p99 * result['margin']))
+        assert abs(yt['timeout'] - expected_timeout) / expected_timeout < 0.2, \
+            f"YouTube timeout {yt['timeout']}ms, expected ~{expected_timeout:.0f}ms"
+        assert yt['timeout'] < 15000, "Fast network should give up on dead embeds sooner than 15s"
+
+        vi = result['estimate']['vi']
+        assert vi['timeout'] > 17000, f"Slow kiosk should not kill 17s loads, timeout is {vi['timeout']}ms"
+        assert vi['timeout'] <= result['ceiling'], "Timeout should respect the ceiling"
+
+        print(f"Load timeout estimate: yt={yt['timeout']}ms (p95={yt['p95']:.0f}ms), vi={vi['timeout']}ms")
+
+    def test_load_timeouts_do_not_ratchet(self, loaded_page):
+        """Test that timed-out loads count as failures and never stretch the adaptive timeout."""
+        rng = random.Random(26)
+        loads = [rng.lognormvariate(math.log(1000), 0.3) for _ in range(300)]
+
+        result = loaded_page.execute_script("""
+            window.resetLoadLatency();
+            const timeouts = [];
+            arguments[0].forEach((ms, i) => {
+                // Каждая десятая загрузка - мертвый embed, который дожидается таймаута
+                if (i % 10 === 9) {
+                    timeouts.push(window.getLoadTimeout('yt'));
+                    window.recordLoadTimeout('yt');
+                } else {
+                    window.recordLoadLatency('yt', ms);
+                }
+            });
+            const estimate = window.loadTimeoutEstimate.yt;
+            window.resetLoadLatency();
+            return { timeouts: timeouts, estimate: estimate };
+        """, loads)
+
+        estimate = result['estimate']
+        assert max(result['timeouts'][1:]) < 15000, f"Timeout ratcheted: {result['timeouts']}"
+        assert estimate['timeout'] == result['timeouts'][-1], estimate
+        assert estimate['timeouts'] == 30 and abs(estimate['timeoutRate'] - 0.1) < 1e-9, estimate
+
+    def test_player_state_snapshot(self, loaded_page, video_player_helper):
+        """Test that the versioned state snapshot covers player, counters, watchdog and timers."""
+        state = video_player_helper.get_state()
+
+        assert state is not None, "window.__playerState should be exposed"
+        assert state['version'] == 1, f"Unexpected snapshot version {state['version']}"
+        for section in ('player', 'video', 'counters', 'flags', 'watchdog', 'history', 'timers', 'constants'):
+            assert section in state, f"Snapshot is missing '{section}'"
+        for name, value in EXPECTED_CONSTANTS.items():
+            if name in state['constants']:
+                assert state['constants'][name] == value, f"{name} should be {value}, got {state['constants'][name]}"
+        assert state['video']['total'] > 0, "Snapshot should report the video list"
+
+    def test_wait_for_state_single_round_trip(self, loaded_page, video_player_helper):
+        """Test that waiting for a page condition costs one WebDriver round trip."""
+        counter = RoundTripCounter(loaded_page)
+        try:
+            state = video_player_helper.wait_for_state("state.video.total > 0 && state.timestamp > 0", timeout=10)
+        finally:
+            counter.uninstall()
+
+        assert state is not None and state['version'] == 1
+        # set_script_timeout + execute_async_script
+        assert counter.count <= 2, f"Expected at most 2 round trips, got {counter.count}: {counter.by_command}"
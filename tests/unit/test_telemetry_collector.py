@@ -0,0 +1,97 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from telemetry_collector import BUCKET_BASE, BeaconError, TelemetryStore, make_server
+
+
+HOUR = 3600
+
+
+def beacon(device='kiosk-1', version='0.0.21', samples=None, counters=None, heap_mb=40.0, seq=0):
+    return json.dumps({
+        'v': 1, 'device': device, 'version': version, 'session': 's1', 'seq': seq, 'ts': 0, 'uptimeS': 60,
+        'counters': counters or {}, 'samples': samples or {}, 'gauges': {'heap_mb': heap_mb}, 'dropped': 0
+    })
+
+
+@pytest.mark.unit
+class TestTelemetryCollector:
+    """Beacon ingestion, SQLite rollups and percentile queries (no browser)."""
+
+    def test_percentiles_per_device_within_bucket_error(self):
+        """Test that rollup percentiles stay within one log bucket of the exact values."""
+        store = TelemetryStore()
+        values = list(range(100, 2100, 20))  # 100 transitions, 100..2080 ms
+        for start in range(0, len(values), 25):
+            store.ingest(beacon(samples={'transition_ms': values[start:start + 25]}), received_at=10 * HOUR)
+        store.ingest(beacon(device='kiosk-2', samples={'transition_ms': [5000] * 10}), received_at=10 * HOUR)
+
+        result = store.percentiles('transition_ms', by='device', percentiles=(50, 95))
+        assert result['kiosk-1']['count'] == 100 and result['kiosk-2']['count'] == 10
+        for percentile, exact in ((50, values[49]), (95, values[94])):
+            reported = result['kiosk-1'][f"p{percentile}"]
+            assert exact <= reported <= exact * BUCKET_BASE + 0.1, (percentile, exact, reported)
+        assert 5000 <= result['kiosk-2']['p50'] <= 5000 * BUCKET_BASE
+
+    def test_groups_by_version_and_filters_hours(self):
+        """Test version grouping, the hours window and that gauges become a metric."""
+        store = TelemetryStore()
+        store.ingest(beacon(version='0.0.20', samples={'first_frame_ms': [900] * 5}, heap_mb=80), received_at=1 * HOUR)
+        store.ingest(beacon(version='0.0.21', samples={'first_frame_ms': [300] * 5}, heap_mb=40), received_at=30 * HOUR)
+
+        by_version = store.percentiles('first_frame_ms', by='version', percentiles=(50,))
+        assert set(by_version) == {'0.0.20', '0.0.21'}
+        assert by_version['0.0.20']['p50'] > by_version['0.0.21']['p50']
+        recent = store.percentiles('heap_mb', by='version', percentiles=(50,), hours=24, now=30 * HOUR)
+        assert set(recent) == {'0.0.21'} and 40 <= recent['0.0.21']['p50'] <= 40 * BUCKET_BASE
+
+    def test_counters_are_summed_per_hour_and_group(self):
+        """Test failure counters summed across beacons and selected by prefix."""
+        store = TelemetryStore()
+        store.ingest(beacon(counters={'failure.timeout': 2, 'recreations': 1}), received_at=HOUR)
+        store.ingest(beacon(counters={'failure.timeout': 1, 'failure.player_error': 3}), received_at=2 * HOUR)
+        store.ingest(beacon(device='kiosk-2', counters={'failure_rate': 7}), received_at=2 * HOUR)
+
+        assert store.counters('failure.') == {'kiosk-1': {'failure.player_error': 3, 'failure.timeout': 3}}
+        assert store.devices()[0]['beacons'] == 2
+
+    @pytest.mark.parametrize("body", [
+        'not json',
+        json.dumps({'v': 2, 'device': 'k', 'version': '1'}),
+        json.dumps({'v': 1, 'device': 'bad device!', 'version': '1'}),
+        json.dumps({'v': 1, 'device': 'k', 'version': '1', 'samples': {'m': 5}}),
+        'x' * 70000
+    ])
+    def test_rejects_malformed_beacons(self, body):
+        """Test that malformed or oversized beacons are rejected without touching the store."""
+        store = TelemetryStore()
+        with pytest.raises(BeaconError):
+            store.ingest(body)
+        assert store.devices() == []
+
+    def test_http_ingest_and_query(self):
+        """Test the HTTP collector end to end on a free local port."""
+        store = TelemetryStore()
+        server = make_server(store, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            request = urllib.request.Request(f"{base}/beacon", data=beacon(samples={'transition_ms': [400, 800]}).encode(),
+                                             headers={'Content-Type': 'text/plain;charset=UTF-8'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                assert response.status == 204
+            with pytest.raises(urllib.error.HTTPError) as rejected:
+                urllib.request.urlopen(urllib.request.Request(f"{base}/beacon", data=b'{}'), timeout=5)
+            assert rejected.value.code == 400
+
+            with urllib.request.urlopen(f"{base}/percentiles?metric=transition_ms&by=version&p=50", timeout=5) as response:
+                result = json.loads(response.read())
+            assert result['0.0.21']['count'] == 2
+        finally:
+            server.shutdown()
+            server.server_close()
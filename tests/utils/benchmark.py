@@ -0,0 +1,181 @@
+"""Statistical benchmarks for the performance suite.
+
+A single ``time.time()`` delta per test lets one noisy run decide pass or
+fail. ``Benchmark`` runs warmup rounds (discarded) and N measured rounds,
+timing each with ``perf_counter_ns``; when the measured function returns a
+number it is kept as a browser-side duration in ms (``performance.now()``
+deltas, free of WebDriver round trips). Outliers are rejected with the
+modified z-score over the median absolute deviation, and every result is
+summarized (median, p95, MAD...) into a JSON report written next to the
+pytest-html report.
+"""
+
+import json
+import math
+import os
+import statistics
+import time
+
+
+OUTLIER_THRESHOLD = 3.5  # Modified z-score above which a sample is rejected
+MAD_SCALE = 0.6745  # Makes MAD comparable to the standard deviation for normal data
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)] if ordered else 0
+
+
+def reject_outliers(samples, threshold=OUTLIER_THRESHOLD):
+    """Split samples into (kept, rejected) by modified z-score; needs at least 3 samples."""
+    if len(samples) < 3:
+        return list(samples), []
+    median = statistics.median(samples)
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    if mad == 0:
+        return list(samples), []
+    kept, rejected = [], []
+    for sample in samples:
+        (rejected if MAD_SCALE * abs(sample - median) / mad > threshold else kept).append(sample)
+    return kept, rejected
+
+
+def summarize(samples, threshold=OUTLIER_THRESHOLD):
+    """Summary statistics (ms) of the samples that survive outlier rejection."""
+    kept, rejected = reject_outliers(samples, threshold)
+    if not kept:
+        return None
+    median = statistics.median(kept)
+    return {
+        'n': len(kept),
+        'median': median,
+        'mean': statistics.fmean(kept),
+        'p95': percentile(kept, 95),
+        'min': min(kept),
+        'max': max(kept),
+        'mad': statistics.median(abs(sample - median) for sample in kept),
+        'stdev': statistics.stdev(kept) if len(kept) > 1 else 0.0,
+        'rejected': rejected,
+        'samples': list(samples)
+    }
+
+
+class BenchmarkResult:
+    """Wall-clock and browser-side summaries of one benchmark.
+
+    ``median``/``p95``/``mad`` are in seconds and use the browser-side clock
+    when the benchmark provided one, wall-clock otherwise.
+    """
+
+    def __init__(self, name, wall, browser, rounds, warmup, failures):
+        self.name = name
+        self.wall = wall
+        self.browser = browser
+        self.rounds = rounds
+        self.warmup = warmup
+        self.failures = failures
+
+    @property
+    def primary(self):
+        return self.browser or self.wall
+
+    @property
+    def ok(self):
+        return self.primary is not None
+
+    @property
+    def median(self):
+        return self.primary['median'] / 1000
+
+    @property
+    def p95(self):
+        return self.primary['p95'] / 1000
+
+    @property
+    def mad(self):
+        return self.primary['mad'] / 1000
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'rounds': self.rounds,
+            'warmup': self.warmup,
+            'failures': self.failures,
+            'clock': 'browser' if self.browser else 'wall',
+            'wall_ms': self.wall,
+            'browser_ms': self.browser
+        }
+
+    def __str__(self):
+        if not self.ok:
+            return f"{self.name}: no successful rounds ({self.failures} failed)"
+        return (f"{self.name}: median {self.median * 1000:.1f}ms, p95 {self.p95 * 1000:.1f}ms, "
+                f"MAD {self.mad * 1000:.1f}ms (n={self.primary['n']}, "
+                f"rejected={len(self.primary['rejected'])}, failed={self.failures})")
+
+
+class Benchmark:
+    """Runs a function with warmup, repetitions and outlier rejection; collects the results."""
+
+    def __init__(self, node, results, warmup=1, rounds=5, outlier_threshold=OUTLIER_THRESHOLD):
+        self.node = node
+        self.results = results
+        self.warmup = warmup
+        self.rounds = rounds
+        self.outlier_threshold = outlier_threshold
+
+    def __call__(self, func, name=None, setup=None, warmup=None, rounds=None, tolerate=()):
+        """Benchmark ``func``; ``setup`` runs untimed before every round.
+
+        ``func`` may return a browser-side duration in ms. Exceptions listed
+        in ``tolerate`` (e.g. ``TimeoutException``) count as failed rounds
+        instead of failing the test.
+        """
+        name = name or func.__name__
+        warmup = self.warmup if warmup is None else warmup
+        rounds = self.rounds if rounds is None else rounds
+        wall_ms, browser_ms, failures = [], [], 0
+
+        for round_index in range(warmup + rounds):
+            if setup:
+                setup()
+            start = time.perf_counter_ns()
+            try:
+                browser_duration = func()
+            except tolerate:
+                failures += round_index >= warmup
+                continue
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            if round_index < warmup:
+                continue
+            wall_ms.append(elapsed_ms)
+            if isinstance(browser_duration, (int, float)):
+                browser_ms.append(float(browser_duration))
+
+        result = BenchmarkResult(
+            name,
+            summarize(wall_ms, self.outlier_threshold),
+            summarize(browser_ms, self.outlier_threshold) if len(browser_ms) == len(wall_ms) else None,
+            rounds, warmup, failures
+        )
+        self.results.append({'test': self.node.nodeid, **result.to_dict()})
+        if result.ok:
+            self.node.user_properties.append((f"{name}_median_ms", round(result.median * 1000, 2)))
+            self.node.user_properties.append((f"{name}_p95_ms", round(result.p95 * 1000, 2)))
+        print(result)
+        return result
+
+
+def benchmark_report_path(config, profile_name):
+    """``benchmarks/<profile>.json`` next to the pytest-html report (``reports/`` without one)."""
+    html_path = getattr(config.option, 'htmlpath', None)
+    report_dir = os.path.dirname(os.path.abspath(html_path)) if html_path else 'reports'
+    return os.path.join(report_dir, 'benchmarks', f"{profile_name}.json")
+
+
+def write_benchmark_report(results, output_file, metadata=None):
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, 'w') as report_file:
+        json.dump({'timestamp': time.time(), **(metadata or {}), 'benchmarks': results}, report_file, indent=2)
+    return output_file
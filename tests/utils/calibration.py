@@ -0,0 +1,115 @@
+"""Machine calibration for performance budgets.
+
+``PERFORMANCE_THRESHOLDS`` (tests/fixtures/test_data.py) is the one budget
+file; the numbers in it are for the reference machine described by
+``CALIBRATION['reference']``. At session start the same fixed workload is
+run in Python and in the browser, and the slowdown against the reference
+becomes a machine speed factor. ``PerformanceBudgets`` multiplies the
+time-based budgets (``SCALED_THRESHOLDS``) by that factor and by the
+device profile's ``budget_multiplier``; memory budgets stay absolute.
+
+``PERF_SPEED_FACTOR=<float>`` pins the factor (e.g. to compare runs on a
+known runner), ``PERF_SPEED_FACTOR=1`` effectively disables calibration.
+"""
+
+import json
+import math
+import os
+import statistics
+import time
+
+from tests.fixtures.test_data import CALIBRATION, PERFORMANCE_THRESHOLDS, SCALED_THRESHOLDS, TIMEOUTS
+
+
+# Same work in both runtimes: build records, sort them, JSON round trip, checksum loop
+BROWSER_REFERENCE_WORKLOAD_JS = """
+const startedAt = performance.now();
+const items = [];
+for (let i = 0; i < 100000; i++) items.push({ id: (i * 7919) % 100003, label: 'video-' + i });
+items.sort((a, b) => a.id - b.id || (a.label < b.label ? -1 : 1));
+const json = JSON.stringify(items.slice(0, 25000));
+let checksum = JSON.parse(json).length;
+for (let i = 0; i < items.length; i++) checksum = (checksum * 31 + items[i].label.length) % 1000003;
+return performance.now() - startedAt;
+"""
+
+
+def python_reference_workload():
+    """Python twin of ``BROWSER_REFERENCE_WORKLOAD_JS``; returns elapsed ms."""
+    started_at = time.perf_counter()
+    items = [{'id': (i * 7919) % 100003, 'label': f"video-{i}"} for i in range(100000)]
+    items.sort(key=lambda item: (item['id'], item['label']))
+    checksum = len(json.loads(json.dumps(items[:25000])))
+    for item in items:
+        checksum = (checksum * 31 + len(item['label'])) % 1000003
+    return (time.perf_counter() - started_at) * 1000
+
+
+def _median_ms(run, repeats, warmup=1):
+    samples = [run() for _ in range(warmup + repeats)][warmup:]
+    return statistics.median(samples)
+
+
+def calibrate(driver=None, repeats=None):
+    """Run the reference workloads and derive the machine speed factor.
+
+    The factor is the geometric mean of the Python and browser slowdowns
+    against ``CALIBRATION['reference']`` (browser part skipped without a
+    driver), clamped to ``CALIBRATION['min_factor']..['max_factor']``.
+    """
+    repeats = repeats or CALIBRATION['repeats']
+    reference = CALIBRATION['reference']
+    pinned = os.getenv('PERF_SPEED_FACTOR')
+    if pinned:
+        return {'factor': float(pinned), 'source': 'PERF_SPEED_FACTOR', 'reference': reference}
+
+    result = {'source': 'calibration', 'reference': reference}
+    ratios = []
+    result['python_ms'] = _median_ms(python_reference_workload, repeats)
+    ratios.append(result['python_ms'] / reference['python_ms'])
+    if driver is not None:
+        try:
+            result['browser_ms'] = _median_ms(lambda: driver.execute_script(BROWSER_REFERENCE_WORKLOAD_JS), repeats)
+            ratios.append(result['browser_ms'] / reference['browser_ms'])
+        except Exception as e:
+            result['browser_error'] = str(e)
+
+    raw_factor = math.exp(sum(math.log(ratio) for ratio in ratios) / len(ratios))
+    result['raw_factor'] = round(raw_factor, 3)
+    result['factor'] = round(min(CALIBRATION['max_factor'], max(CALIBRATION['min_factor'], raw_factor)), 2)
+    return result
+
+
+class PerformanceBudgets:
+    """Effective budgets: ``PERFORMANCE_THRESHOLDS`` x device multiplier x machine factor."""
+
+    def __init__(self, device_profile, calibration):
+        self.device_profile = device_profile
+        self.calibration = calibration
+        self.factor = calibration['factor']
+
+    @property
+    def multiplier(self):
+        return self.device_profile['budget_multiplier'] * self.factor
+
+    def get(self, key, scaled=None):
+        """Budget for ``key``; time-based keys (``SCALED_THRESHOLDS``) are scaled unless ``scaled=False``."""
+        value = PERFORMANCE_THRESHOLDS[key]
+        if scaled is None:
+            scaled = key in SCALED_THRESHOLDS
+        return value * self.multiplier if scaled else value
+
+    def timeout(self, key):
+        """Wait timeout from ``TIMEOUTS``; only ever stretched, never shortened below the base value."""
+        return TIMEOUTS[key] * self.device_profile['budget_multiplier'] * max(1.0, self.factor)
+
+    def effective(self):
+        return {key: round(self.get(key), 3) for key in PERFORMANCE_THRESHOLDS}
+
+    def to_dict(self):
+        return {
+            'machine_factor': self.factor,
+            'device_multiplier': self.device_profile['budget_multiplier'],
+            'calibration': self.calibration,
+            'effective_budgets': self.effective()
+        }
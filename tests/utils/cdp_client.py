@@ -0,0 +1,225 @@
+"""Asyncio Chrome DevTools Protocol client for low-overhead instrumentation.
+
+Selenium's ``execute_script`` goes test thread -> chromedriver (HTTP) ->
+DevTools and back, and blocks the test while it does. This client opens
+its own websocket to the browser Selenium already started (the
+``goog:chromeOptions.debuggerAddress`` capability), attaches to the page
+target with a flattened session and keeps any number of commands in
+flight at once, so event subscriptions and batched ``Runtime.evaluate``
+calls cost a fraction of a WebDriver round trip.
+
+``CDPClient`` is the asyncio API; ``BackgroundCDP`` runs it on a private
+event loop thread so synchronous pytest code can use it.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+
+import websockets
+
+
+class CDPError(Exception):
+    """Error response returned by the browser for a CDP command."""
+
+    def __init__(self, method, error):
+        super().__init__(f"{method}: {error.get('message')} ({error.get('code')})")
+        self.method = method
+        self.error = error
+
+
+def get_debugger_address(driver):
+    """``host:port`` of the DevTools endpoint of a Selenium Chrome session."""
+    address = driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+    if not address:
+        raise RuntimeError("Browser does not expose goog:chromeOptions.debuggerAddress")
+    return address
+
+
+def get_browser_websocket_url(debugger_address):
+    """Browser-level websocket URL from the DevTools ``/json/version`` endpoint."""
+    with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=5) as response:
+        return json.loads(response.read())['webSocketDebuggerUrl']
+
+
+class CDPClient:
+    """Multiplexed CDP connection: concurrent commands, event subscriptions, sessions."""
+
+    def __init__(self, websocket_url):
+        self.websocket_url = websocket_url
+        self.session_id = None
+        self.child_sessions = set()  # auto-attached targets (out-of-process iframes) whose events we keep
+        self._ws = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._handlers = defaultdict(list)
+        self._reader = None
+        self.stats = {'commands': 0, 'events': 0}
+
+    async def connect(self):
+        self._ws = await websockets.connect(self.websocket_url, max_size=None, ping_interval=None)
+        self._reader = asyncio.ensure_future(self._read_loop())
+        return self
+
+    async def attach_to_page(self, url_contains=None):
+        """Attach to the first page target (optionally matching a URL substring)."""
+        targets = (await self.send('Target.getTargets', session=False))['targetInfos']
+        pages = [t for t in targets if t['type'] == 'page' and (not url_contains or url_contains in t['url'])]
+        if not pages:
+            raise RuntimeError(f"No page target found (url_contains={url_contains!r})")
+        result = await self.send('Target.attachToTarget', {'targetId': pages[0]['targetId'], 'flatten': True},
+                                 session=False)
+        self.session_id = result['sessionId']
+        return self.session_id
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        if self._ws:
+            await self._ws.close()
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def send(self, method, params=None, session=True):
+        """Send a command and await its result; ``session`` may name a child session instead of the page."""
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if isinstance(session, str):
+            message['sessionId'] = session
+        elif session and self.session_id:
+            message['sessionId'] = self.session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (method, future)
+        self.stats['commands'] += 1
+        await self._ws.send(json.dumps(message))
+        return await future
+
+    async def evaluate(self, expression, await_promise=False):
+        """``Runtime.evaluate`` returning the JSON value of the expression."""
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': await_promise
+        })
+        if 'exceptionDetails' in result:
+            raise CDPError('Runtime.evaluate', {'message': result['exceptionDetails'].get('text'), 'code': None})
+        return result['result'].get('value')
+
+    async def evaluate_many(self, expressions):
+        """Pipeline several evaluations on the socket and gather the values in order."""
+        return await asyncio.gather(*(self.evaluate(expression) for expression in expressions))
+
+    def spawn(self, coroutine):
+        """Schedule a command from an event handler without awaiting it (handlers run synchronously)."""
+        return asyncio.ensure_future(coroutine)
+
+    def subscribe(self, event, handler):
+        """Call ``handler(params)`` for every ``event`` (e.g. ``Runtime.consoleAPICalled``)."""
+        self._handlers[event].append(handler)
+        return lambda: self._handlers[event].remove(handler)
+
+    async def enable(self, *domains):
+        """Enable several domains concurrently (``Runtime``, ``Network``, ``Performance``...)."""
+        await asyncio.gather(*(self.send(f"{domain}.enable") for domain in domains))
+
+    async def _read_loop(self):
+        async for raw in self._ws:
+            message = json.loads(raw)
+            if 'id' in message:
+                method, future = self._pending.pop(message['id'], (None, None))
+                if future is None or future.done():
+                    continue
+                if 'error' in message:
+                    future.set_exception(CDPError(method, message['error']))
+                else:
+                    future.set_result(message.get('result', {}))
+            elif 'method' in message:
+                params = message.get('params', {})
+                session_id = message.get('sessionId')
+                if self.session_id and session_id not in (None, self.session_id):
+                    if session_id not in self.child_sessions:
+                        continue
+                    params = dict(params, sessionId=session_id)  # handlers can tell child events apart
+                self.stats['events'] += 1
+                for handler in list(self._handlers.get(message['method'], ())):
+                    handler(params)
+
+
+class BackgroundCDP:
+    """Synchronous facade over ``CDPClient`` running on its own event loop thread."""
+
+    def __init__(self, driver, url_contains=None, max_events=10000):
+        self.driver = driver
+        self.url_contains = url_contains
+        self.max_events = max_events
+        self.events = defaultdict(lambda: deque(maxlen=self.max_events))
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='cdp-client', daemon=True)
+        self.client = None
+
+    def start(self):
+        self._thread.start()
+        websocket_url = get_browser_websocket_url(get_debugger_address(self.driver))
+        self.client = self.run(CDPClient(websocket_url).connect())
+        self.run(self.client.attach_to_page(self.url_contains))
+        return self
+
+    def stop(self):
+        if self.client:
+            self.run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def run(self, coroutine, timeout=30):
+        """Run a coroutine on the client loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def send(self, method, params=None):
+        return self.run(self.client.send(method, params))
+
+    def evaluate(self, expression, await_promise=False):
+        return self.run(self.client.evaluate(expression, await_promise))
+
+    def evaluate_many(self, expressions):
+        return self.run(self.client.evaluate_many(expressions))
+
+    def subscribe(self, *events, domains=()):
+        """Record the given events into ``self.events[name]`` (bounded deques)."""
+        def register():
+            for event in events:
+                self.client.subscribe(event, self.events[event].append)
+        self._loop.call_soon_threadsafe(register)
+        if domains:
+            self.run(self.client.enable(*domains))
+        return self
+
+    def on(self, event, handler):
+        """Call ``handler(params)`` on the client thread for every ``event``; returns an unsubscribe callable."""
+        async def register():
+            return self.client.subscribe(event, handler)
+        unsubscribe = self.run(register())
+        return lambda: self._loop.call_soon_threadsafe(unsubscribe)
+
+    def sample(self, expression, interval=0.05, duration=1.0):
+        """Evaluate ``expression`` every ``interval`` seconds on the client loop (no test-thread hops)."""
+        async def sampler():
+            samples = []
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                samples.append((time.monotonic(), await self.client.evaluate(expression)))
+                await asyncio.sleep(interval)
+            return samples
+        return self.run(sampler(), timeout=duration + 30)
@@ -0,0 +1,299 @@
+"""Seeded chaos engine: injects faults into the fake-player page and measures recovery.
+
+``ChaosEngine`` draws a reproducible schedule from ``ERROR_SCENARIOS``
+(tests/fixtures/test_data.py) with ``random.Random(seed)``: fault type,
+fault parameters and the dwell time of steady playback before it. Every
+scenario waits for steady playback, injects the fault and lets an in-page
+monitor sample the player every ``SAMPLE_MS``. The monitor records when
+the screen first stopped showing advancing video (time to blank), how
+long it stayed that way (blank time) and when playback was back for
+``sustain_ms`` (time to recovery). The JS heap is measured after a forced
+GC before and after each scenario.
+
+``ChaosReport`` aggregates per fault type (MTTR percentiles, blank time,
+heap growth) and is written as JSON; the seed in the report replays the
+same schedule (``CHAOS_SEED=<seed>``).
+"""
+
+import json
+import os
+import random
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from tests.fixtures.test_data import CHAOS, ERROR_SCENARIOS
+from tests.utils.benchmark import percentile
+
+
+SAMPLE_MS = 50
+ADVANCE_WINDOW_MS = 750  # currentTime must have moved within this window (fake ticks every 250ms)
+
+MONITOR_JS = r"""
+if (!window.__chaosMonitor) {
+  const monitor = window.__chaosMonitor = { scenario: null, healthySince: null, lastTime: -1, lastAdvanceAt: 0 };
+  // Видно продвигающееся видео: плеер играет, картинка есть, currentTime недавно сдвигался
+  monitor.healthy = function (now, advanceWindowMs) {
+    const p = window.__fakePlyr.current();
+    if (!p || !p.ready || p.paused || p.ended) return false;
+    if (p.currentTime !== monitor.lastTime) {
+      monitor.lastTime = p.currentTime;
+      monitor.lastAdvanceAt = now;
+    }
+    return p.media.videoWidth > 0 && p.currentTime > 0 && now - monitor.lastAdvanceAt < advanceWindowMs;
+  };
+  monitor.begin = function (fault, sustainMs) {
+    const now = performance.now();
+    monitor.scenario = { fault: fault, sustainMs: sustainMs, injectedAt: now, blankAt: null, restoredAt: null,
+                         blankMs: 0, lastSampleAt: now, healthySince: null };
+    return now;
+  };
+  setInterval(function () {
+    const now = performance.now();
+    const ok = monitor.healthy(now, ADVANCE_WINDOW_MS);
+    monitor.healthySince = ok ? (monitor.healthySince === null ? now : monitor.healthySince) : null;
+    const s = monitor.scenario;
+    if (s && s.restoredAt === null) {
+      if (!ok) {
+        if (s.blankAt === null) s.blankAt = now;
+        s.blankMs += now - s.lastSampleAt;
+        s.healthySince = null;
+      } else if (s.blankAt !== null) {
+        if (s.healthySince === null) s.healthySince = now;
+        if (now - s.healthySince >= s.sustainMs) s.restoredAt = s.healthySince;
+      }
+      s.lastSampleAt = now;
+    }
+  }, SAMPLE_MS);
+}
+""".replace('SAMPLE_MS', str(SAMPLE_MS)).replace('ADVANCE_WINDOW_MS', str(ADVANCE_WINDOW_MS))
+
+POSTMESSAGE_FLOOD_JS = """
+for (let i = 0; i < arguments[0]; i++) {
+  window.dispatchEvent(new ErrorEvent('error', {
+    message: "Failed to execute 'postMessage' on 'DOMWindow': target origin does not match (cross-origin)"
+  }));
+}
+"""
+
+
+class ChaosEngine:
+    """Runs a seeded schedule of faults against a ``FakePlayerPage``."""
+
+    def __init__(self, page, seed=None, scenarios=None, config=None):
+        self.page = page
+        self.driver = page.driver
+        self.seed = seed if seed is not None else int(os.getenv('CHAOS_SEED') or random.randrange(2 ** 32))
+        self.scenarios = scenarios or ERROR_SCENARIOS
+        self.config = dict(CHAOS, **(config or {}))
+        self.results = []
+        self.resets = 0
+
+    def open(self, query='', **fake_config):
+        self.page.open(query, **fake_config)
+        self.driver.execute_script(MONITOR_JS)
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        return self
+
+    def schedule(self, count):
+        """The first ``count`` scenarios of this seed: same seed, same faults, parameters and timing."""
+        rng = random.Random(self.seed)
+        weights = [scenario.get('weight', 1) for scenario in self.scenarios]
+        plan = []
+        for index in range(count):
+            scenario = rng.choices(self.scenarios, weights)[0]
+            params = {}
+            for name, spec in sorted(scenario.get('params', {}).items()):
+                params[name] = rng.randint(*spec) if isinstance(spec, tuple) else rng.choice(spec)
+            plan.append({'index': index, 'fault': scenario['name'], 'params': params,
+                         'dwell_ms': rng.randint(*self.config['dwell_ms'])})
+        return plan
+
+    def run(self, count=None):
+        count = count or int(os.getenv('CHAOS_SCENARIOS') or self.config['scenarios'])
+        print(f"Chaos: {count} scenarios, seed {self.seed} (replay with CHAOS_SEED={self.seed})")
+        for scenario in self.schedule(count):
+            self.results.append(self.run_scenario(scenario))
+        return self.report()
+
+    def run_scenario(self, scenario):
+        if not self.wait_steady():
+            self.reset()
+        time.sleep(scenario['dwell_ms'] / 1000)
+        heap_before = self.heap_used()
+        self.driver.execute_script("return window.__chaosMonitor.begin(arguments[0], arguments[1]);",
+                                   scenario['fault'], self.config['sustain_ms'])
+        getattr(self, f"inject_{scenario['fault']}")(**scenario['params'])
+        outcome = self.wait_outcome()
+        heap_after = self.heap_used()
+        return dict(scenario, **outcome, heap_delta_mb=(
+            (heap_after - heap_before) / 1024 / 1024 if heap_before is not None and heap_after is not None else None
+        ))
+
+    # Faults
+
+    def inject_load_timeout(self):
+        self.page.inject('outageNext', 1)
+        self.driver.execute_script("window.loadNextVideo();")
+
+    def inject_player_error(self):
+        self.page.inject('error', 'Chaos: injected media error')
+
+    def inject_stall_start(self):
+        self.page.inject('stallNextStart', 1)
+        self.driver.execute_script("window.loadNextVideo();")
+
+    def inject_stall_mid(self):
+        self.page.inject('stall')
+
+    def inject_missing_video(self, healed_by):
+        self.page.inject('hideVideo', healed_by)
+
+    def inject_postmessage_flood(self, errors):
+        self.driver.execute_script(POSTMESSAGE_FLOOD_JS, errors)
+
+    def inject_network_drop(self, duration_ms):
+        self.set_offline(True)
+        try:
+            time.sleep(duration_ms / 1000)
+        finally:
+            self.set_offline(False)
+
+    def set_offline(self, offline):
+        self.driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
+            'offline': offline, 'latency': 0, 'downloadThroughput': -1, 'uploadThroughput': -1
+        })
+
+    # Measurements
+
+    def wait_outcome(self):
+        """Poll the monitor until recovery, absorption (no outage) or the recovery timeout."""
+        deadline = time.time() + self.config['recovery_timeout']
+        while True:
+            state = self.driver.execute_script(
+                "const s = window.__chaosMonitor.scenario;"
+                "return Object.assign({ now: performance.now() }, s);"
+            )
+            elapsed = state['now'] - state['injectedAt']
+            if state['restoredAt'] is not None:
+                return {
+                    'outcome': 'recovered',
+                    'mttr_ms': state['restoredAt'] - state['injectedAt'],
+                    'time_to_blank_ms': state['blankAt'] - state['injectedAt'],
+                    'blank_ms': state['blankMs']
+                }
+            if state['blankAt'] is None and elapsed >= self.config['absorb_ms']:
+                return {'outcome': 'absorbed', 'mttr_ms': 0.0, 'time_to_blank_ms': None, 'blank_ms': 0.0}
+            if time.time() > deadline:
+                return {
+                    'outcome': 'unrecovered',
+                    'mttr_ms': None,
+                    'time_to_blank_ms': state['blankAt'] - state['injectedAt'] if state['blankAt'] is not None else None,
+                    'blank_ms': state['blankMs']
+                }
+            time.sleep(0.2)
+
+    def wait_steady(self, timeout=30):
+        try:
+            self.page.wait_until(
+                f"const m = window.__chaosMonitor; return m.healthySince !== null && "
+                f"performance.now() - m.healthySince >= {self.config['sustain_ms']};",
+                timeout=timeout, poll=0.2
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def reset(self):
+        """Bring a wedged page back: skip to the next video, reopen the page as a last resort."""
+        self.resets += 1
+        self.set_offline(False)
+        self.driver.execute_script("window.loadNextVideo();")
+        if not self.wait_steady():
+            print(f"Chaos: page did not recover, reopening (reset #{self.resets})")
+            self.open()
+            self.page.wait_for_playing()
+
+    def heap_used(self):
+        try:
+            self.driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+            return self.driver.execute_cdp_cmd('Runtime.getHeapUsage', {})['usedSize']
+        except WebDriverException:
+            return None
+
+    def report(self):
+        return ChaosReport(self.seed, self.results, self.resets)
+
+
+def _distribution(values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {
+        'p50': round(percentile(values, 50), 1),
+        'p95': round(percentile(values, 95), 1),
+        'p99': round(percentile(values, 99), 1),
+        'max': round(max(values), 1)
+    }
+
+
+class ChaosReport:
+    """Per-fault-type recovery statistics of a chaos run."""
+
+    def __init__(self, seed, results, resets=0):
+        self.seed = seed
+        self.results = results
+        self.resets = resets
+
+    def by_fault(self):
+        faults = {}
+        for result in self.results:
+            faults.setdefault(result['fault'], []).append(result)
+        summary = {}
+        for fault, results in sorted(faults.items()):
+            heap = [r['heap_delta_mb'] for r in results if r['heap_delta_mb'] is not None]
+            summary[fault] = {
+                'count': len(results),
+                'recovered': sum(1 for r in results if r['outcome'] == 'recovered'),
+                'absorbed': sum(1 for r in results if r['outcome'] == 'absorbed'),
+                'unrecovered': sum(1 for r in results if r['outcome'] == 'unrecovered'),
+                'mttr_ms': _distribution([r['mttr_ms'] for r in results if r['outcome'] == 'recovered']),
+                'time_to_blank_ms': _distribution([r['time_to_blank_ms'] for r in results]),
+                'blank_ms': _distribution([r['blank_ms'] for r in results]),
+                'heap_delta_mb': {
+                    'mean': round(sum(heap) / len(heap), 3),
+                    'max': round(max(heap), 3),
+                    'total': round(sum(heap), 3)
+                } if heap else None
+            }
+        return summary
+
+    @property
+    def unrecovered(self):
+        return [r for r in self.results if r['outcome'] == 'unrecovered']
+
+    def format_table(self):
+        lines = [f"Chaos seed {self.seed}: {len(self.results)} scenarios, {len(self.unrecovered)} unrecovered, "
+                 f"{self.resets} resets",
+                 f"{'Fault':<18} {'N':>4} {'Rec':>4} {'Abs':>4} {'Fail':>4} {'MTTR p50':>9} {'p95':>8} "
+                 f"{'p99':>8} {'Blank p95':>10} {'Heap MB':>8}"]
+        for fault, stats in self.by_fault().items():
+            mttr = stats['mttr_ms'] or {}
+            blank = stats['blank_ms'] or {}
+            heap = stats['heap_delta_mb'] or {}
+            lines.append(
+                f"{fault:<18} {stats['count']:>4} {stats['recovered']:>4} {stats['absorbed']:>4} "
+                f"{stats['unrecovered']:>4} {mttr.get('p50', '-'):>9} {mttr.get('p95', '-'):>8} "
+                f"{mttr.get('p99', '-'):>8} {blank.get('p95', '-'):>10} {heap.get('mean', '-'):>8}"
+            )
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        return {'seed': self.seed, 'resets': self.resets, 'faults': self.by_fault(), 'scenarios': self.results}
+
+    def write(self, output_dir=os.path.join('reports', 'chaos')):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"chaos-{self.seed}.json")
+        with open(path, 'w') as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+        return path
@@ -0,0 +1,246 @@
+"""Sampling CPU profiles of the player page, aggregated per function.
+
+``CpuProfileSession`` wraps a test in CDP ``Profiler.start``/``Profiler.stop``
+with a configurable sampling interval (enabled for the whole suite with
+``run_tests.py --cpu-profile``). ``CpuProfileAggregator`` merges any number
+of profiles into self/total time per function and writes:
+
+- ``<run>.cpuprofile`` - the raw profile of each run (opens in DevTools);
+- ``profile.folded`` - folded stacks for flamegraph.pl / speedscope;
+- ``hotspots.txt`` / ``hotspots.json`` - functions ranked by self time,
+  with ``index.html`` functions (watchdog, ``updateHistoryUI``...) tagged
+  as ``page`` next to Plyr and the provider iframes.
+
+Profiles saved by earlier runs can be re-aggregated with::
+
+    python -m tests.utils.cpu_profile reports/cpu/*.cpuprofile --top 30
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from urllib.parse import urlparse
+
+
+DEFAULT_SAMPLING_INTERVAL_US = 1000
+SPECIAL_FRAMES = ('(root)', '(program)', '(idle)', '(garbage collector)')
+
+
+def classify_source(url):
+    """Which part of the page a script URL belongs to."""
+    if not url:
+        return 'native'
+    parsed = urlparse(url)
+    if parsed.path in ('', '/') or parsed.path.endswith('.html'):
+        return 'page'
+    for marker, source in (('plyr', 'plyr'), ('youtube', 'youtube'), ('ytimg', 'youtube'), ('vimeo', 'vimeo')):
+        if marker in url:
+            return source
+    return parsed.netloc or 'other'
+
+
+def frame_key(call_frame):
+    """(function, source, line) - the unit times are aggregated by."""
+    name = call_frame.get('functionName') or '(anonymous)'
+    url = call_frame.get('url', '')
+    if name in SPECIAL_FRAMES:
+        return (name, 'native', 0)
+    return (name, classify_source(url), call_frame.get('lineNumber', -1) + 1)
+
+
+def frame_label(key):
+    name, source, line = key
+    if source == 'native':
+        return name
+    location = 'index.html' if source == 'page' else source
+    return f"{name} ({location}:{line})"
+
+
+class CpuProfileSession:
+    """Profiler.start/stop on the current page through chromedriver's CDP passthrough."""
+
+    def __init__(self, driver, interval_us=DEFAULT_SAMPLING_INTERVAL_US):
+        self.driver = driver
+        self.interval_us = interval_us
+        self.running = False
+
+    def start(self):
+        self.driver.execute_cdp_cmd('Profiler.enable', {})
+        self.driver.execute_cdp_cmd('Profiler.setSamplingInterval', {'interval': self.interval_us})
+        self.driver.execute_cdp_cmd('Profiler.start', {})
+        self.running = True
+        return self
+
+    def stop(self):
+        """Stop sampling and return the CDP ``Profile`` object."""
+        if not self.running:
+            return None
+        self.running = False
+        profile = self.driver.execute_cdp_cmd('Profiler.stop', {})['profile']
+        self.driver.execute_cdp_cmd('Profiler.disable', {})
+        return profile
+
+
+class CpuProfileAggregator:
+    """Self/total time per function and folded stacks across profiles."""
+
+    def __init__(self, output_dir=None, interval_us=DEFAULT_SAMPLING_INTERVAL_US):
+        self.output_dir = output_dir
+        self.interval_us = interval_us
+        self.functions = {}
+        self.folded = Counter()
+        self.runs = []
+        self.total_us = 0
+
+    def add(self, profile, label=None):
+        """Merge one CDP profile; the raw profile is saved when ``output_dir`` is set."""
+        nodes = {node['id']: node for node in profile['nodes']}
+        parents = {}
+        for node in profile['nodes']:
+            for child in node.get('children', ()):
+                parents[child] = node['id']
+
+        # A sample lasts until the next one; the last one until endTime
+        self_us = Counter()
+        samples = profile.get('samples', [])
+        sample_counts = Counter(samples)
+        deltas = profile.get('timeDeltas', [])
+        timestamp = profile['startTime']
+        for index, node_id in enumerate(samples):
+            timestamp += deltas[index] if index < len(deltas) else 0
+            if index + 1 < len(deltas):
+                duration = deltas[index + 1]
+            else:
+                duration = max(profile['endTime'] - timestamp, 0)
+            self_us[node_id] += duration
+
+        stacks = {}
+
+        def stack_of(node_id):
+            if node_id not in stacks:
+                parent = parents.get(node_id)
+                prefix = stack_of(parent) if parent is not None else ()
+                stacks[node_id] = prefix + (frame_key(nodes[node_id]['callFrame']),)
+            return stacks[node_id]
+
+        run_us = 0
+        for node_id, duration in self_us.items():
+            if not duration:
+                continue
+            stack = stack_of(node_id)
+            run_us += duration
+            entry = self._entry(stack[-1])
+            entry['self_us'] += duration
+            entry['samples'] += sample_counts[node_id]
+            for key in set(stack):
+                self._entry(key)['total_us'] += duration
+            frames = [frame_label(key).replace(';', ':') for key in stack if key[0] != '(root)']
+            self.folded[';'.join(frames) or '(root)'] += duration
+
+        self.total_us += run_us
+        label = label or f"run{len(self.runs) + 1}"
+        self.runs.append({'label': label, 'duration_us': run_us})
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, f"{_safe_name(label)}.cpuprofile"), 'w') as profile_file:
+                json.dump(profile, profile_file)
+        return run_us
+
+    def _entry(self, key):
+        if key not in self.functions:
+            self.functions[key] = {'self_us': 0, 'total_us': 0, 'samples': 0}
+        return self.functions[key]
+
+    def ranked(self, top=30, source=None, include_idle=False):
+        """Functions sorted by self time, optionally limited to one source ('page', 'plyr'...)."""
+        rows = []
+        for key, entry in self.functions.items():
+            name, key_source, line = key
+            if not include_idle and name in ('(idle)', '(program)', '(root)'):
+                continue
+            if source and key_source != source:
+                continue
+            rows.append({
+                'function': name,
+                'source': key_source,
+                'line': line,
+                'self_ms': entry['self_us'] / 1000,
+                'total_ms': entry['total_us'] / 1000,
+                'self_percent': 100 * entry['self_us'] / self.total_us if self.total_us else 0,
+                'total_percent': 100 * entry['total_us'] / self.total_us if self.total_us else 0
+            })
+        rows.sort(key=lambda row: row['self_ms'], reverse=True)
+        return rows[:top] if top else rows
+
+    def source_breakdown(self):
+        """Self time per source (page, plyr, youtube, native...), in ms."""
+        breakdown = Counter()
+        for (name, source, _), entry in self.functions.items():
+            if name not in ('(idle)', '(root)'):
+                breakdown[source] += entry['self_us'] / 1000
+        return dict(breakdown.most_common())
+
+    def format_table(self, top=30):
+        lines = [
+            f"CPU profile: {len(self.runs)} run(s), {self.total_us / 1e6:.1f}s sampled",
+            'Self time by source: ' + ', '.join(
+                f"{source} {ms:.0f}ms" for source, ms in self.source_breakdown().items()),
+            f"{'Self ms':>10} {'Self %':>7} {'Total ms':>10} {'Total %':>8}  Function"
+        ]
+        for row in self.ranked(top):
+            location = '' if row['source'] == 'native' else \
+                f" ({'index.html' if row['source'] == 'page' else row['source']}:{row['line']})"
+            lines.append(
+                f"{row['self_ms']:>10.1f} {row['self_percent']:>6.1f}% {row['total_ms']:>10.1f} "
+                f"{row['total_percent']:>7.1f}%  {row['function']}{location}"
+            )
+        return '\n'.join(lines)
+
+    def write_reports(self, output_dir=None, top=50):
+        """Write folded stacks and the ranked tables; returns the output directory."""
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, 'profile.folded'), 'w') as folded_file:
+            for stack, duration in sorted(self.folded.items()):
+                folded_file.write(f"{stack} {duration}\n")
+        with open(os.path.join(output_dir, 'hotspots.txt'), 'w') as table_file:
+            table_file.write(self.format_table(top) + '\n')
+        with open(os.path.join(output_dir, 'hotspots.json'), 'w') as json_file:
+            json.dump({
+                'sampling_interval_us': self.interval_us,
+                'runs': self.runs,
+                'total_ms': self.total_us / 1000,
+                'sources': self.source_breakdown(),
+                'functions': self.ranked(top=None, include_idle=True),
+                'page_functions': self.ranked(top=None, source='page')
+            }, json_file, indent=2)
+        return output_dir
+
+
+def _safe_name(label):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')[:120] or 'run'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aggregate .cpuprofile files into per-function hot spots')
+    parser.add_argument('profiles', nargs='+', help='.cpuprofile files (CDP Profile JSON)')
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--out', help='Directory for profile.folded and hotspots.{txt,json}')
+    args = parser.parse_args(argv)
+
+    aggregator = CpuProfileAggregator()
+    for path in args.profiles:
+        with open(path) as profile_file:
+            aggregator.add(json.load(profile_file), label=os.path.basename(path))
+    print(aggregator.format_table(args.top))
+    if args.out:
+        aggregator.write_reports(args.out, top=args.top)
+        print(f"Reports written to {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
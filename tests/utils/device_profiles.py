@@ -0,0 +1,42 @@
+"""CDP emulation of the kiosk hardware profiles defined in ``DEVICE_PROFILES``."""
+
+from tests.fixtures.test_data import DEVICE_PROFILES, DEFAULT_DEVICE_PROFILE
+
+
+def get_device_profile(name=None):
+    """Return the named profile (with its ``name``) or raise for unknown names."""
+    name = name or DEFAULT_DEVICE_PROFILE
+    if name not in DEVICE_PROFILES:
+        raise ValueError(f"Unknown device profile '{name}', expected one of: {', '.join(DEVICE_PROFILES)}")
+    return dict(DEVICE_PROFILES[name], name=name)
+
+
+def apply_device_profile(driver, profile):
+    """Apply CPU, network and memory-pressure emulation to the current page target."""
+    driver.execute_cdp_cmd('Emulation.setCPUThrottlingRate', {'rate': profile['cpu_throttling_rate']})
+
+    network = profile.get('network')
+    if network:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
+            'offline': False,
+            'latency': network['latency'],
+            'downloadThroughput': network['download_kbps'] * 1024 / 8,
+            'uploadThroughput': network['upload_kbps'] * 1024 / 8
+        })
+
+    if profile.get('window_size'):
+        driver.set_window_size(*profile['window_size'])
+
+    if profile.get('memory_pressure'):
+        simulate_memory_pressure(driver, profile['memory_pressure'])
+
+
+def simulate_memory_pressure(driver, level='moderate'):
+    """Send a memory-pressure notification ('moderate' or 'critical') to the browser."""
+    try:
+        driver.execute_cdp_cmd('Memory.simulatePressureNotification', {'level': level})
+        return True
+    except Exception as e:
+        print(f"Memory pressure emulation not available: {e}")
+        return False
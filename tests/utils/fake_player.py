@@ -0,0 +1,331 @@
+"""Local fake Plyr player for deterministic browser tests.
+
+The fake replaces ``window.Plyr`` before any page script runs (via CDP
+``Page.addScriptToEvaluateOnNewDocument``), so ``index.html`` drives it
+exactly like the real player while tests control load latency, playback
+progress and faults without touching YouTube or Vimeo.
+"""
+
+import json
+import time
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+FAKE_PLYR_JS = r"""
+(function () {
+  const config = Object.assign({
+    loadLatency: { youtube: 200, vimeo: 200 }, // мс до события ready
+    outage: {},                                // provider -> true: embed никогда не готов
+    tickInterval: 250,                         // период timeupdate
+    duration: 600,                             // длительность каждого видео, с
+    autoplayBlocked: false,                    // play() со звуком отклоняется
+    startStalled: false,                       // воспроизведение не стартует (currentTime=0)
+    decodeLimit: null,                         // выше этого качества (p) теряется 30% кадров - слабый киоск
+    messageRate: 0,                            // postMessage в секунду от embed во время воспроизведения
+    createFailures: 0                          // столько первых new Plyr() бросают исключение
+  }, window.__fakePlyrConfig || {});
+
+  const instances = [];
+  const ORIGINS = { youtube: 'https://www.youtube.com', vimeo: 'https://player.vimeo.com' };
+  // Сообщение от embed провайдера (синтетическое: origin задается, source нет)
+  function postFromEmbed(provider, data) {
+    window.dispatchEvent(new MessageEvent('message', { data: data, origin: ORIGINS[provider] || ORIGINS.youtube }));
+  }
+  // healedBy: что возвращает картинку - 'repaint' (CSS), 'reload' (источник) или 'recreate' (новый плеер)
+  const faults = { stalled: false, stalledAt: null, videoHidden: false, healedBy: null, hiddenInstance: null,
+                   outageLoads: 0, stalledStarts: 0, offline: false, flood: null };
+  // Сеть отключена (CDP Network.emulateNetworkConditions): загрузки не завершаются, воспроизведение буферизуется
+  window.addEventListener('offline', () => { faults.offline = true; record('offline'); });
+  window.addEventListener('online', () => { faults.offline = false; record('online'); });
+  const log = [];
+
+  function record(type, detail) {
+    log.push(Object.assign({ type: type, at: performance.now() }, detail || {}));
+    if (log.length > 500) log.shift();
+  }
+
+  class FakePlyr {
+    constructor(target, options) {
+      if (config.createFailures > 0) {
+        config.createFailures--;
+        record('create_failed');
+        throw new Error('Injected player creation failure');
+      }
+      this.options = options || {};
+      this.handlers = {};
+      this.timers = [];
+      this.ready = false;
+      this.paused = true;
+      this.ended = false;
+      this.muted = false;
+      this.volume = 1;
+      this.quality = null;
+      this._currentTime = 0;
+      this.duration = 0;
+      this.provider = null;
+      this.elements = { container: target };
+      this.media = document.createElement('video');
+      this.frames = { decoded: 0, dropped: 0 };
+      this.media.getVideoPlaybackQuality = () => ({ totalVideoFrames: this.frames.decoded, droppedVideoFrames: this.frames.dropped });
+      Object.defineProperty(this.media, 'videoWidth', { get: () => (faults.videoHidden ? 0 : 1280) });
+      Object.defineProperty(this.media, 'videoHeight', { get: () => (faults.videoHidden ? 0 : 720) });
+      if (target && target.appendChild) target.appendChild(this.media);
+      if (typeof MutationObserver !== 'undefined') {
+        // CSS-перерисовка (transform) лечит поломку уровня 'repaint'
+        new MutationObserver(() => {
+          if (faults.videoHidden && faults.healedBy === 'repaint' && this.media.style.transform) {
+            faults.videoHidden = false;
+            record('repaint_heal');
+          }
+        }).observe(this.media, { attributes: true, attributeFilter: ['style'] });
+      }
+      instances.push(this);
+      record('create');
+    }
+
+    get playing() { return this.ready && !this.paused && !this.ended; }
+    get currentTime() { return this._currentTime; }
+    set currentTime(value) { this._currentTime = value; }
+    // Качество: выставленное страницей, иначе из опций Plyr, иначе выбор провайдера (1080p)
+    get effectiveQuality() { return this.quality || (this.options.quality && this.options.quality.default) || 1080; }
+
+    on(event, handler) { (this.handlers[event] = this.handlers[event] || []).push(handler); return this; }
+    once(event, handler) {
+      const wrapper = (...args) => { this.off(event, wrapper); handler.apply(this, args); };
+      return this.on(event, wrapper);
+    }
+    off(event, handler) {
+      if (!handler) { delete this.handlers[event]; }
+      else { this.handlers[event] = (this.handlers[event] || []).filter(h => h !== handler); }
+      return this;
+    }
+    emit(event, detail) {
+      const payload = { type: event, detail: Object.assign({ plyr: this }, detail instanceof Error
+        ? { message: detail.message, name: detail.name } : (detail || {})) };
+      (this.handlers[event] || []).slice().forEach(h => h.call(this, payload));
+    }
+
+    later(fn, delay) { const id = setTimeout(fn, delay); this.timers.push(id); return id; }
+    clearTimers() {
+      this.timers.forEach(id => { clearTimeout(id); clearInterval(id); });
+      this.timers = [];
+    }
+
+    get source() { return this._source || null; }
+    set source(source) {
+      this.clearTimers();
+      this._source = source;
+      this.provider = source && source.sources && source.sources[0] ? source.sources[0].provider : null;
+      this.ready = false;
+      this.paused = true;
+      this.ended = false;
+      this._currentTime = 0;
+      this.duration = 0;
+      this.frames = { decoded: 0, dropped: 0 };
+      faults.stalled = false;
+      faults.stalledAt = null;
+      if (faults.flood && faults.flood.instance === this && !faults.flood.sticky) {
+        // Новый iframe - поток от старого прекращается
+        clearInterval(faults.flood.timer);
+        record('flood_end', { by: 'reload', sent: faults.flood.sent });
+        faults.flood = null;
+      }
+      if (faults.healedBy !== 'recreate' || faults.hiddenInstance !== this) faults.videoHidden = false;
+      record('source', { provider: this.provider, id: source && source.sources ? source.sources[0].src : null });
+      this._startStalled = faults.stalledStarts > 0;
+      if (this._startStalled) faults.stalledStarts--;
+      if (config.outage[this.provider] || faults.offline) return;
+      if (faults.outageLoads > 0) {
+        faults.outageLoads--;
+        record('outage_load', { provider: this.provider });
+        return;
+      }
+      this.later(() => {
+        this.ready = true;
+        this.duration = config.duration;
+        record('ready', { provider: this.provider });
+        this.emit('ready');
+      }, config.loadLatency[this.provider] || 0);
+    }
+
+    play() {
+      if (!this.ready) return Promise.resolve();
+      if (config.autoplayBlocked && !this.muted) {
+        record('play_blocked');
+        const error = new Error('play() failed because the user did not interact with the document first. NotAllowedError');
+        error.name = 'NotAllowedError';
+        return Promise.reject(error);
+      }
+      if (!this.paused) return Promise.resolve();
+      this.paused = false;
+      record('play', { muted: this.muted });
+      this.emit('play');
+      this.later(() => {
+        if (this.paused) return;
+        this.emit('playing');
+        this.startTicking();
+      }, 30);
+      return Promise.resolve();
+    }
+
+    pause() {
+      if (this.paused) return;
+      this.paused = true;
+      this.emit('pause');
+    }
+
+    startTicking() {
+      const id = setInterval(() => {
+        if (this.paused || this.ended) return;
+        if (faults.stalled || faults.offline || config.startStalled || (this._startStalled && this._currentTime === 0)) {
+          if (!this._waiting) { this._waiting = true; this.emit('waiting'); }
+          return;
+        }
+        this._waiting = false;
+        this._currentTime += config.tickInterval / 1000;
+        this._messages = (this._messages || 0) + config.messageRate * config.tickInterval / 1000;
+        for (; this._messages >= 1; this._messages--) {
+          postFromEmbed(this.provider, JSON.stringify({ event: 'infoDelivery', info: { currentTime: this._currentTime } }));
+        }
+        const frames = config.tickInterval / 1000 * 30;
+        this.frames.decoded += frames;
+        if (config.decodeLimit) this.frames.dropped += frames * (this.effectiveQuality > config.decodeLimit ? 0.3 : 0.01);
+        this.emit('timeupdate');
+        if (this._currentTime >= this.duration) {
+          this.ended = true;
+          record('ended');
+          this.emit('ended');
+        }
+      }, config.tickInterval);
+      this.timers.push(id);
+    }
+
+    destroy() {
+      this.clearTimers();
+      this.handlers = {};
+      if (this.media && this.media.parentNode) this.media.parentNode.removeChild(this.media);
+      this.destroyed = true;
+      record('destroy');
+    }
+  }
+
+  window.__fakePlyr = {
+    config: config,
+    faults: faults,
+    instances: instances,
+    log: log,
+    current() { return instances.filter(p => !p.destroyed).pop() || null; },
+    stall() { faults.stalled = true; faults.stalledAt = performance.now(); record('stall'); },
+    outageNext(count) { faults.outageLoads += count || 1; },          // следующие загрузки не станут ready
+    setOutage(provider, down) { config.outage[provider] = down !== false; record('outage', { provider: provider, down: down !== false }); },
+    stallNextStart(count) { faults.stalledStarts += count || 1; },    // следующие видео зависнут на 0:00
+    resume() { faults.stalled = false; faults.stalledAt = null; },
+    hideVideo(healedBy) {
+      faults.videoHidden = true;
+      faults.healedBy = healedBy || 'reload';
+      faults.hiddenInstance = this.current();
+      record('hide_video', { healedBy: faults.healedBy });
+    },
+    showVideo() { faults.videoHidden = false; },
+    // Поток postMessage от embed текущего плеера; sticky - переживает перезагрузку источника
+    flood(rate, seconds, sticky) {
+      const instance = this.current();
+      const provider = instance && instance.provider;
+      const perTick = Math.max(1, Math.round((rate || 500) / 100));
+      const until = performance.now() + (seconds || 10) * 1000;
+      this.stopFlood();
+      const flood = faults.flood = { instance: instance, sticky: !!sticky, sent: 0 };
+      flood.timer = setInterval(() => {
+        if (performance.now() >= until) { this.stopFlood(); return; }
+        for (let i = 0; i < perTick && faults.flood === flood; i++) {
+          flood.sent++;
+          postFromEmbed(provider, '{"event":"infoDelivery","info":{"videoLoadedFraction":0}}');
+        }
+      }, 10);
+      record('flood', { provider: provider, rate: perTick * 100 });
+    },
+    stopFlood() {
+      if (!faults.flood) return;
+      clearInterval(faults.flood.timer);
+      record('flood_end', { by: 'timeout', sent: faults.flood.sent });
+      faults.flood = null;
+    },
+    error(message) {
+      const current = this.current();
+      if (current) current.emit('error', { message: message || 'Injected error', name: 'MediaError' });
+    }
+  };
+
+  Object.defineProperty(window, 'Plyr', { get: () => FakePlyr, set: () => {}, configurable: true });
+})();
+"""
+
+
+VISIBILITY_JS = r"""
+const hidden = arguments[0];
+Object.defineProperty(document, 'hidden', { get: () => hidden, configurable: true });
+Object.defineProperty(document, 'visibilityState', { get: () => (hidden ? 'hidden' : 'visible'), configurable: true });
+document.dispatchEvent(new Event('visibilitychange'));
+"""
+
+
+class FakePlayerPage:
+    """Opens the player page with the fake Plyr installed."""
+
+    def __init__(self, driver, base_url):
+        self.driver = driver
+        self.base_url = base_url
+        self._script_id = None
+
+    def open(self, query='', **config):
+        """Load the page with the fake player; ``config`` overrides ``__fakePlyrConfig``."""
+        source = f"window.__fakePlyrConfig = {json.dumps(config)};\n{FAKE_PLYR_JS}"
+        if self._script_id:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': self._script_id})
+        result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        self._script_id = result.get('identifier')
+
+        query = query.lstrip('?')
+        params = [query] if query else []
+        if 'testMode=' not in query:
+            params.append('testMode=true')
+        self.driver.get(f"{self.base_url}/?{'&'.join(params)}")
+        WebDriverWait(self.driver, 30).until(
+            lambda d: d.execute_script("return typeof window.playerSettings !== 'undefined';")
+        )
+        return self
+
+    def wait_for_playing(self, timeout=30):
+        """Wait until the page's player reports advancing playback."""
+        WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(
+                "const p = window.__fakePlyr.current(); return !!(p && p.playing && p.currentTime > 0);"
+            )
+        )
+
+    def inject(self, fault, *args):
+        """Call one of the ``__fakePlyr`` fault helpers (stall, hideVideo, error, ...)."""
+        return self.driver.execute_script(
+            "return window.__fakePlyr[arguments[0]].apply(window.__fakePlyr, arguments[1]);", fault, list(args)
+        )
+
+    def set_hidden(self, hidden):
+        """Emulate the tab going to background (focus loss via CDP plus a visibility flip)."""
+        self.driver.execute_cdp_cmd('Emulation.setFocusEmulationEnabled', {'enabled': not hidden})
+        self.driver.execute_script(VISIBILITY_JS, hidden)
+
+    def set_lifecycle_state(self, state):
+        """Freeze (``'frozen'``) or resume (``'active'``) the page through the Page Lifecycle API."""
+        self.driver.execute_cdp_cmd('Page.setWebLifecycleState', {'state': state})
+
+    def now(self):
+        """Browser-side ``performance.now()`` in milliseconds."""
+        return self.driver.execute_script("return performance.now();")
+
+    def wait_until(self, script, timeout=30, poll=0.1):
+        """Poll a boolean script until it returns true; returns elapsed seconds."""
+        start = time.time()
+        WebDriverWait(self.driver, timeout, poll_frequency=poll).until(lambda d: d.execute_script(script))
+        return time.time() - start
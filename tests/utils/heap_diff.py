@@ -0,0 +1,420 @@
+"""Heap snapshot diffing across player recreations.
+
+Snapshots are taken over CDP (``HeapProfiler.takeHeapSnapshot``) with the
+chunks streamed straight to disk, then parsed back with
+``JsonStreamReader`` into compact arrays. For each snapshot we compute
+dominators and retained sizes; the diff ranks constructors (Plyr,
+HTMLIFrameElement, ``setupPlayerEvents`` closures, Array...) by retained
+size growth and samples the shortest retainer paths of objects that
+appeared between the two snapshots.
+
+CLI::
+
+    python -m tests.utils.heap_diff diff before.heapsnapshot after.heapsnapshot --top 20
+    python -m tests.utils.heap_diff capture --url http://localhost:8000/?testMode=true --cycles 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+
+from tests.utils.json_stream import JsonStreamReader
+
+
+WEAK_EDGE = 'weak'
+SHORTCUT_EDGE = 'shortcut'
+INDEXED_EDGES = ('element', 'hidden')
+
+RECREATION_CYCLE_JS = """
+cleanupPlayer(true);
+player = createPlayer();
+if (player) {
+    setupPlayerEvents();
+    syncWindowVariables();
+    setVideoSource(videos[currentIndex]);
+}
+return !!player;
+"""
+
+
+class HeapSnapshot:
+    """Parsed heap snapshot with dominator-based retained sizes."""
+
+    def __init__(self, meta, nodes, edges, strings):
+        self.meta = meta['meta']
+        self.nodes = nodes
+        self.edges = edges
+        self.strings = strings
+
+        node_fields = self.meta['node_fields']
+        edge_fields = self.meta['edge_fields']
+        self.node_field_count = len(node_fields)
+        self.edge_field_count = len(edge_fields)
+        self.type_offset = node_fields.index('type')
+        self.name_offset = node_fields.index('name')
+        self.id_offset = node_fields.index('id')
+        self.self_size_offset = node_fields.index('self_size')
+        self.edge_count_offset = node_fields.index('edge_count')
+        self.edge_type_offset = edge_fields.index('type')
+        self.edge_name_offset = edge_fields.index('name_or_index')
+        self.edge_to_offset = edge_fields.index('to_node')
+        self.node_types = self.meta['node_types'][self.type_offset]
+        self.edge_types = self.meta['edge_types'][self.edge_type_offset]
+
+        self.node_count = len(nodes) // self.node_field_count
+        self.edge_count = len(edges) // self.edge_field_count
+        self._index_edges()
+        self._compute_dominators()
+
+    @classmethod
+    def load(cls, path):
+        """Stream-parse a ``.heapsnapshot`` file."""
+        meta, nodes, edges, strings = None, None, None, None
+        with open(path, encoding='utf-8') as snapshot_file:
+            reader = JsonStreamReader(snapshot_file)
+            for key in reader.iter_object_keys():
+                if key == 'snapshot':
+                    meta = reader.read_value()
+                elif key == 'nodes':
+                    nodes = reader.read_number_array()
+                elif key == 'edges':
+                    edges = reader.read_number_array()
+                elif key == 'strings':
+                    strings = reader.read_string_array()
+                else:
+                    reader.skip_value()
+        if meta is None or nodes is None or edges is None or strings is None:
+            raise ValueError(f"{path} is not a complete heap snapshot")
+        return cls(meta, nodes, edges, strings)
+
+    # Node/edge accessors
+
+    def node_type(self, node):
+        return self.node_types[self.nodes[node * self.node_field_count + self.type_offset]]
+
+    def node_name(self, node):
+        return self.strings[self.nodes[node * self.node_field_count + self.name_offset]]
+
+    def node_id(self, node):
+        return self.nodes[node * self.node_field_count + self.id_offset]
+
+    def self_size(self, node):
+        return self.nodes[node * self.node_field_count + self.self_size_offset]
+
+    def edge_type(self, edge):
+        return self.edge_types[self.edges[edge * self.edge_field_count + self.edge_type_offset]]
+
+    def edge_name(self, edge):
+        name = self.edges[edge * self.edge_field_count + self.edge_name_offset]
+        if self.edge_type(edge) in INDEXED_EDGES:
+            return f"[{name}]"
+        return self.strings[name]
+
+    def edge_target(self, edge):
+        return self.edges[edge * self.edge_field_count + self.edge_to_offset] // self.node_field_count
+
+    def class_name(self, node):
+        """Constructor-like grouping key, close to the DevTools summary view."""
+        node_type = self.node_type(node)
+        name = self.node_name(node)
+        if node_type in ('object', 'native'):
+            return name.split(' / ')[0] or f"({node_type})"
+        if node_type == 'closure':
+            return f"{name}()" if name else '(anonymous closure)'
+        return f"({node_type})"
+
+    def _is_followed(self, edge):
+        return self.edge_type(edge) not in (WEAK_EDGE, SHORTCUT_EDGE)
+
+    # Graph construction
+
+    def _index_edges(self):
+        """First-edge offsets per node and a reverse (predecessor) index in CSR form."""
+        self.first_edge = array('l', [0]) * (self.node_count + 1)
+        self.edge_owner = array('l', [0]) * self.edge_count
+        offset = 0
+        for node in range(self.node_count):
+            self.first_edge[node] = offset
+            count = self.nodes[node * self.node_field_count + self.edge_count_offset]
+            for edge in range(offset, offset + count):
+                self.edge_owner[edge] = node
+            offset += count
+        self.first_edge[self.node_count] = offset
+
+        in_degree = array('l', [0]) * (self.node_count + 1)
+        for edge in range(self.edge_count):
+            if self._is_followed(edge):
+                in_degree[self.edge_target(edge) + 1] += 1
+        for node in range(self.node_count):
+            in_degree[node + 1] += in_degree[node]
+        self.pred_start = in_degree
+        self.pred_edges = array('l', [0]) * in_degree[self.node_count]
+        fill = array('l', in_degree[:self.node_count])
+        for edge in range(self.edge_count):
+            if self._is_followed(edge):
+                target = self.edge_target(edge)
+                self.pred_edges[fill[target]] = edge
+                fill[target] += 1
+
+    def _compute_dominators(self, root=0):
+        """Iterative dominators (Cooper/Harvey/Kennedy) and retained sizes."""
+        count = self.node_count
+        post_index = array('l', [-1]) * count
+        postorder = array('l')
+        visited = bytearray(count)
+        stack = [(root, self.first_edge[root])]
+        visited[root] = 1
+        while stack:
+            node, edge = stack[-1]
+            end = self.first_edge[node + 1]
+            while edge < end and (not self._is_followed(edge) or visited[self.edge_target(edge)]):
+                edge += 1
+            if edge < end:
+                stack[-1] = (node, edge + 1)
+                target = self.edge_target(edge)
+                visited[target] = 1
+                stack.append((target, self.first_edge[target]))
+            else:
+                stack.pop()
+                post_index[node] = len(postorder)
+                postorder.append(node)
+
+        idom = array('l', [-1]) * count
+        idom[root] = root
+        changed = True
+        while changed:
+            changed = False
+            for position in range(len(postorder) - 2, -1, -1):  # reverse postorder, root excluded
+                node = postorder[position]
+                new_idom = -1
+                for slot in range(self.pred_start[node], self.pred_start[node + 1]):
+                    pred = self.edge_owner[self.pred_edges[slot]]
+                    if idom[pred] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = pred
+                        continue
+                    a, b = pred, new_idom
+                    while a != b:
+                        while post_index[a] < post_index[b]:
+                            a = idom[a]
+                        while post_index[b] < post_index[a]:
+                            b = idom[b]
+                    new_idom = a
+                if new_idom != -1 and idom[node] != new_idom:
+                    idom[node] = new_idom
+                    changed = True
+
+        retained = array('q', (self.self_size(node) if visited[node] else 0 for node in range(count)))
+        for node in postorder:
+            if node != root and idom[node] != -1:
+                retained[idom[node]] += retained[node]
+        self.idom = idom
+        self.retained = retained
+        self.reachable = visited
+
+    # Aggregation
+
+    def summary(self):
+        """Per-class count, self size and retained size (excluding nested same-class objects)."""
+        classes = {}
+        for node in range(self.node_count):
+            if not self.reachable[node]:
+                continue
+            name = self.class_name(node)
+            entry = classes.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += self.self_size(node)
+            dominator = self.idom[node]
+            if dominator == node or self.class_name(dominator) != name:
+                entry[2] += self.retained[node]
+        return classes
+
+    def node_ids(self):
+        return {self.node_id(node) for node in range(self.node_count) if self.reachable[node]}
+
+    def retainer_path(self, node, distances, max_depth=12):
+        """Shortest retainer chain from the GC root to ``node``."""
+        path = []
+        current = node
+        while current != 0 and len(path) < max_depth:
+            best_edge, best_distance = None, None
+            for slot in range(self.pred_start[current], self.pred_start[current + 1]):
+                edge = self.pred_edges[slot]
+                distance = distances[self.edge_owner[edge]]
+                if distance >= 0 and (best_distance is None or distance < best_distance):
+                    best_edge, best_distance = edge, distance
+            if best_edge is None:
+                break
+            owner = self.edge_owner[best_edge]
+            path.append(f"{self.class_name(owner)}.{self.edge_name(best_edge)}")
+            current = owner
+        path.reverse()
+        path.append(self.class_name(node))
+        return ' -> '.join(path)
+
+    def root_distances(self):
+        distances = array('l', [-1]) * self.node_count
+        distances[0] = 0
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for edge in range(self.first_edge[node], self.first_edge[node + 1]):
+                target = self.edge_target(edge)
+                if self._is_followed(edge) and distances[target] == -1:
+                    distances[target] = distances[node] + 1
+                    queue.append(target)
+        return distances
+
+
+def diff_snapshots(before, after, top=20, sample_paths=3):
+    """Rank classes by retained size growth; sample retainer paths of new objects."""
+    before_summary = before.summary()
+    after_summary = after.summary()
+    before_ids = before.node_ids()
+
+    new_nodes = {}
+    for node in range(after.node_count):
+        if after.reachable[node] and after.node_id(node) not in before_ids:
+            new_nodes.setdefault(after.class_name(node), []).append(node)
+
+    rows = []
+    for name in set(before_summary) | set(after_summary):
+        count_before, self_before, retained_before = before_summary.get(name, (0, 0, 0))
+        count_after, self_after, retained_after = after_summary.get(name, (0, 0, 0))
+        rows.append({
+            'class': name,
+            'count_before': count_before,
+            'count_after': count_after,
+            'count_delta': count_after - count_before,
+            'self_size_delta': self_after - self_before,
+            'retained_size_delta': retained_after - retained_before,
+            'new_objects': len(new_nodes.get(name, ())),
+            'retainer_paths': []
+        })
+    rows.sort(key=lambda row: (row['retained_size_delta'], row['count_delta']), reverse=True)
+    rows = rows[:top]
+
+    if sample_paths:
+        distances = after.root_distances()
+        for row in rows:
+            for node in new_nodes.get(row['class'], [])[:sample_paths]:
+                row['retainer_paths'].append(after.retainer_path(node, distances))
+
+    return {
+        'total_before': sum(entry[1] for entry in before_summary.values()),
+        'total_after': sum(entry[1] for entry in after_summary.values()),
+        'classes': rows
+    }
+
+
+def format_diff(report, paths=True):
+    """Human-readable table for assertion messages and the CLI."""
+    lines = [
+        f"Heap self size: {report['total_before'] / 1024 / 1024:.2f}MB -> "
+        f"{report['total_after'] / 1024 / 1024:.2f}MB",
+        f"{'Retained Δ':>12} {'Self Δ':>10} {'Count Δ':>8} {'New':>6}  Class"
+    ]
+    for row in report['classes']:
+        lines.append(
+            f"{row['retained_size_delta'] / 1024:>10.1f}KB {row['self_size_delta'] / 1024:>8.1f}KB "
+            f"{row['count_delta']:>8} {row['new_objects']:>6}  {row['class']}"
+        )
+        if paths:
+            for path in row['retainer_paths']:
+                lines.append(f"{'':>40}  ↳ {path}")
+    return '\n'.join(lines)
+
+
+class HeapSnapshotRecorder:
+    """Takes heap snapshots over an attached ``BackgroundCDP`` client, streaming chunks to disk."""
+
+    def __init__(self, cdp, output_dir):
+        self.cdp = cdp
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def take(self, label, collect_garbage=True):
+        path = os.path.join(self.output_dir, f"{label}.heapsnapshot")
+        self.cdp.send('HeapProfiler.enable')
+        if collect_garbage:
+            self.cdp.send('HeapProfiler.collectGarbage')
+        with open(path, 'w', encoding='utf-8') as snapshot_file:
+            unsubscribe = self.cdp.on('HeapProfiler.addHeapSnapshotChunk',
+                                      lambda params: snapshot_file.write(params['chunk']))
+            try:
+                self.cdp.run(self.cdp.client.send('HeapProfiler.takeHeapSnapshot', {'reportProgress': False}),
+                             timeout=300)
+            finally:
+                unsubscribe()
+        return path
+
+
+def run_recreation_cycles(driver, cycles, pause=1.5):
+    """Destroy and recreate the player ``cycles`` times, as loadVideo() does on recreation."""
+    for _ in range(cycles):
+        driver.execute_script(RECREATION_CYCLE_JS)
+        time.sleep(pause)
+
+
+def _capture(args):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from tests.utils.cdp_client import BackgroundCDP
+
+    options = Options()
+    for argument in ('--headless=new', '--no-sandbox', '--disable-dev-shm-usage', '--window-size=1920,1080'):
+        options.add_argument(argument)
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(args.url)
+        time.sleep(args.settle)
+        with BackgroundCDP(driver) as cdp:
+            recorder = HeapSnapshotRecorder(cdp, args.out)
+            before = recorder.take('before')
+            run_recreation_cycles(driver, args.cycles)
+            time.sleep(args.settle)
+            after = recorder.take('after')
+    finally:
+        driver.quit()
+    print(f"Snapshots written to {before} and {after}")
+    return before, after
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Diff V8 heap snapshots across player recreations')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = commands.add_parser('diff', help='Diff two .heapsnapshot files')
+    diff_parser.add_argument('before')
+    diff_parser.add_argument('after')
+
+    capture_parser = commands.add_parser('capture', help='Capture before/after snapshots around recreations')
+    capture_parser.add_argument('--url', default='http://localhost:8000/?testMode=true')
+    capture_parser.add_argument('--cycles', type=int, default=5)
+    capture_parser.add_argument('--settle', type=float, default=5.0, help='Seconds to wait before snapshots')
+    capture_parser.add_argument('--out', default=os.path.join('reports', 'heap'))
+
+    for sub in (diff_parser, capture_parser):
+        sub.add_argument('--top', type=int, default=20)
+        sub.add_argument('--paths', type=int, default=3, help='Retainer paths sampled per class')
+        sub.add_argument('--json', help='Also write the report as JSON')
+
+    args = parser.parse_args(argv)
+    before_path, after_path = (args.before, args.after) if args.command == 'diff' else _capture(args)
+
+    report = diff_snapshots(HeapSnapshot.load(before_path), HeapSnapshot.load(after_path),
+                            top=args.top, sample_paths=args.paths)
+    print(format_diff(report))
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
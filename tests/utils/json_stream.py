@@ -0,0 +1,150 @@
+"""Incremental reader for large JSON documents such as V8 heap snapshots.
+
+``json.load`` on a heap snapshot creates a Python int for every entry of
+the flat ``nodes``/``edges`` arrays (tens of millions for a real page).
+``JsonStreamReader`` reads the file in chunks instead: numeric arrays go
+straight into compact ``array.array`` buffers, other values are decoded
+one at a time with the C-accelerated ``JSONDecoder.raw_decode``, and
+values the caller does not need are skipped without being built.
+"""
+
+import json
+import re
+from array import array
+
+
+_WHITESPACE = ' \t\n\r'
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamReader:
+    """Pull parser over a text file object, holding at most a couple of chunks in memory."""
+
+    def __init__(self, fileobj, chunk_size=1 << 20):
+        self.file = fileobj
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Append the next chunk, dropping consumed text; False at end of file."""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def read_value(self):
+        """Decode one complete JSON value; meant for small values (keys, strings, metadata)."""
+        while True:
+            self.peek()
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue  # a number may continue in the next chunk
+            self.pos = end
+            return value
+
+    def iter_object_keys(self):
+        """Yield the keys of an object; the caller must consume each value before resuming."""
+        self.expect('{')
+        while True:
+            char = self.peek()
+            if char == '}':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            key = self.read_value()
+            self.expect(':')
+            yield key
+
+    def read_number_array(self, typecode='l'):
+        """Read a flat array of integers into an ``array.array``."""
+        self.expect('[')
+        values = array(typecode)
+        while True:
+            end = self.buf.find(']', self.pos)
+            if end != -1:
+                segment = self.buf[self.pos:end]
+                if segment.strip():
+                    values.extend(map(int, segment.split(',')))
+                self.pos = end + 1
+                return values
+            # Keep the last, possibly truncated, number for the next chunk
+            cut = self.buf.rfind(',', self.pos)
+            if cut != -1:
+                values.extend(map(int, self.buf[self.pos:cut].split(',')))
+                self.pos = cut + 1
+            if not self._fill():
+                raise ValueError("Unterminated number array")
+
+    def iter_array(self):
+        """Yield the elements of an array one at a time (e.g. the events of a trace file)."""
+        self.expect('[')
+        while True:
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            yield self.read_value()
+
+    def read_string_array(self):
+        """Read an array of strings (or other small values) into a list."""
+        return list(self.iter_array())
+
+    def skip_value(self):
+        """Skip over any value without decoding its contents."""
+        if self.peek() not in '[{':
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON while skipping a value")
+                continue
+            if match.group() == '"':
+                string = _STRING.match(self.buf, match.start())
+                if string is None:  # string continues in the next chunk
+                    self.pos = match.start()
+                    if not self._fill():
+                        raise ValueError("Unterminated string")
+                    continue
+                self.pos = string.end()
+                continue
+            self.pos = match.end()
+            depth += 1 if match.group() in '[{' else -1
+            if depth == 0:
+                return
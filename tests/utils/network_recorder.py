@@ -0,0 +1,237 @@
+"""Per-transition network waterfall and bandwidth accounting over CDP.
+
+``NetworkRecorder`` streams ``Network.*`` events from the page and from
+every out-of-process iframe: YouTube and Vimeo embeds are cross-site and
+run in their own targets, so the recorder auto-attaches to them
+(``Target.setAutoAttach`` with flattened sessions). The page calls the
+``__networkMarker`` binding (``Runtime.addBinding``) from
+``actuallySetVideoSource()``, so every transition starts at the exact
+moment a new source was set.
+
+Each transition counts requests and bytes per origin. Traffic from
+iframes that should already be dead is flagged as stale: anything from a
+removed frame, and anything from a frame or request of an earlier
+transition after the grace period (in-flight responses of the old embed
+may still complete while it is torn down).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+MARKER_BINDING = '__networkMarker'
+STALE_GRACE_S = 2.0
+
+
+def origin_of(url):
+    """``scheme://host[:port]`` of a URL (``data``/``blob`` URLs collapse to their scheme)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else parts.scheme
+
+
+class Transition:
+    """Traffic between two source markers."""
+
+    def __init__(self, index, marker, started):
+        self.index = index
+        self.marker = marker
+        self.started = started
+        self.origins = defaultdict(lambda: {'requests': 0, 'bytes': 0, 'late_bytes': 0})
+        self.fresh_origins = set()  # origins requested by this transition's own frames
+        self.stale = defaultdict(lambda: {'requests': 0, 'bytes': 0})
+
+    def as_dict(self, origin_time):
+        return {
+            'index': self.index,
+            'marker': self.marker,
+            'started_s': round(self.started - origin_time, 3),
+            'requests': sum(o['requests'] for o in self.origins.values()),
+            'bytes': sum(o['bytes'] for o in self.origins.values()),
+            'origins': {name: dict(counts) for name, counts in self.origins.items()},
+            'stale': {name: dict(counts) for name, counts in self.stale.items()}
+        }
+
+
+class NetworkRecorder:
+    """Streams CDP network events into per-transition accounting (see module docstring)."""
+
+    def __init__(self, cdp, grace_s=STALE_GRACE_S):
+        self.cdp = cdp
+        self.grace_s = grace_s
+        self.started = time.monotonic()
+        self.transitions = [Transition(0, {'label': 'page_load'}, self.started)]
+        self.main_frame_id = None
+        self._lock = threading.Lock()
+        self._requests = {}  # (session, requestId) -> request info
+        self._frames = {}  # frameId -> index of the transition that first used it
+        self._removed_frames = {}  # frameId -> monotonic time of removal
+        self._unsubscribe = []
+
+    def start(self):
+        handlers = {
+            'Runtime.bindingCalled': self._on_binding,
+            'Network.requestWillBeSent': self._on_request,
+            'Network.dataReceived': self._on_data,
+            'Network.loadingFinished': self._on_finished,
+            'Network.loadingFailed': self._on_failed,
+            'Page.frameDetached': self._on_frame_detached,
+            'Target.attachedToTarget': self._on_attached
+        }
+        for event, handler in handlers.items():
+            self._unsubscribe.append(self.cdp.on(event, handler))
+        self.cdp.run(self.cdp.client.enable('Runtime', 'Network', 'Page'))
+        self.cdp.send('Runtime.addBinding', {'name': MARKER_BINDING})
+        self.cdp.send('Target.setAutoAttach', {'autoAttach': True, 'waitForDebuggerOnStart': False, 'flatten': True})
+        self.main_frame_id = self.cdp.send('Page.getFrameTree')['frameTree']['frame']['id']
+        return self
+
+    def stop(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        self.cdp.send('Runtime.removeBinding', {'name': MARKER_BINDING})
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def mark(self, label):
+        """Start a transition from the test side (e.g. before a cleanup that sets no source)."""
+        self._begin_transition({'label': label})
+
+    # Event handlers run on the CDP client thread
+
+    def _begin_transition(self, marker):
+        with self._lock:
+            self.transitions.append(Transition(len(self.transitions), marker, time.monotonic()))
+
+    def _on_binding(self, params):
+        if params.get('name') != MARKER_BINDING or params.get('sessionId'):
+            return
+        try:
+            marker = json.loads(params.get('payload') or '{}')
+        except ValueError:
+            marker = {'payload': params.get('payload')}
+        self._begin_transition(marker)
+
+    def _on_attached(self, params):
+        # Out-of-process iframe: its network events arrive on its own session
+        session_id = params['sessionId']
+        client = self.cdp.client
+        client.child_sessions.add(session_id)
+        with self._lock:
+            self._frames.setdefault(params['targetInfo']['targetId'], self.transitions[-1].index)
+        client.spawn(client.send('Network.enable', session=session_id))
+
+    def _on_frame_detached(self, params):
+        if params.get('reason', 'remove') == 'remove':  # 'swap' moves the frame to another process
+            with self._lock:
+                self._removed_frames[params['frameId']] = time.monotonic()
+
+    def _is_stale(self, frame_id, started_in, now):
+        current = self.transitions[-1]
+        if frame_id is None or frame_id == self.main_frame_id:
+            return False
+        removed_at = self._removed_frames.get(frame_id)
+        if removed_at is not None and now - removed_at > self.grace_s:
+            return True
+        born = min(self._frames.get(frame_id, current.index), started_in)
+        return born < current.index and now - current.started > self.grace_s
+
+    def _on_request(self, params):
+        url = params['request']['url']
+        if url.startswith('data:'):
+            return
+        now = time.monotonic()
+        frame_id = params.get('frameId')
+        with self._lock:
+            current = self.transitions[-1]
+            if frame_id:
+                self._frames.setdefault(frame_id, current.index)
+            info = {'origin': origin_of(url), 'frame': frame_id, 'transition': current.index, 'bytes': 0}
+            self._requests[(params.get('sessionId'), params['requestId'])] = info
+            current.origins[info['origin']]['requests'] += 1
+            if self._is_stale(frame_id, current.index, now):
+                current.stale[info['origin']]['requests'] += 1
+            else:
+                current.fresh_origins.add(info['origin'])
+
+    def _credit(self, info, size):
+        now = time.monotonic()
+        current = self.transitions[-1]
+        counts = current.origins[info['origin']]
+        counts['bytes'] += size
+        if now - current.started > self.grace_s:
+            counts['late_bytes'] += size
+        if self._is_stale(info['frame'], info['transition'], now):
+            current.stale[info['origin']]['bytes'] += size
+
+    def _on_data(self, params):
+        with self._lock:
+            info = self._requests.get((params.get('sessionId'), params['requestId']))
+            size = params.get('encodedDataLength') or 0
+            if info and size:
+                info['bytes'] += size
+                self._credit(info, size)
+
+    def _on_finished(self, params):
+        with self._lock:
+            info = self._requests.pop((params.get('sessionId'), params['requestId']), None)
+            if not info:
+                return
+            # Some responses report the encoded length only at the end
+            remaining = (params.get('encodedDataLength') or 0) - info['bytes']
+            if remaining > 0:
+                self._credit(info, remaining)
+
+    def _on_failed(self, params):
+        with self._lock:
+            self._requests.pop((params.get('sessionId'), params['requestId']), None)
+
+    # Reporting
+
+    def report(self):
+        with self._lock:
+            return [transition.as_dict(self.started) for transition in self.transitions]
+
+    def stale_bytes(self, index=None):
+        """Bytes from dead iframes in one transition (all transitions when ``index`` is None)."""
+        with self._lock:
+            transitions = self.transitions if index is None else [self.transitions[index]]
+            return sum(counts['bytes'] for t in transitions for counts in t.stale.values())
+
+    def bytes_to_previous_origins(self, index):
+        """Bytes after the grace period to origins of transition ``index - 1`` that ``index`` itself never requested."""
+        with self._lock:
+            previous, current = self.transitions[index - 1], self.transitions[index]
+            abandoned = set(previous.fresh_origins) - current.fresh_origins
+            return {origin: current.origins[origin]['late_bytes'] for origin in abandoned
+                    if current.origins[origin]['late_bytes'] > 0}
+
+    def format_table(self, top=5):
+        """Waterfall summary: one line per transition with its heaviest origins."""
+        lines = [f"{'#':>3} {'marker':<28} {'start s':>8} {'req':>5} {'KB':>9} {'stale KB':>9}  top origins"]
+        for transition in self.report():
+            marker = transition['marker']
+            label = marker.get('label') or f"{marker.get('provider', '?')}:{marker.get('id', '?')}"
+            heaviest = sorted(transition['origins'].items(), key=lambda item: -item[1]['bytes'])[:top]
+            stale = sum(counts['bytes'] for counts in transition['stale'].values())
+            lines.append(
+                f"{transition['index']:>3} {label[:28]:<28} {transition['started_s']:>8.1f} {transition['requests']:>5} "
+                f"{transition['bytes'] / 1024:>9.0f} {stale / 1024:>9.0f}  "
+                + ', '.join(f"{urlsplit(origin).netloc or origin} {counts['bytes'] // 1024}KB" for origin, counts in heaviest)
+            )
+        return '\n'.join(lines)
+
+    def write(self, output_dir=os.path.join('reports', 'network')):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"network-{int(time.time())}.json")
+        with open(path, 'w') as report_file:
+            json.dump({'grace_s': self.grace_s, 'transitions': self.report()}, report_file, indent=2)
+        return path
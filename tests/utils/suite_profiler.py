@@ -0,0 +1,208 @@
+"""pytest plugin timing the test suite itself.
+
+Enabled with ``pytest --suite-profile`` (``run_tests.py --suite-profile``).
+Every fixture setup and teardown, every test phase (setup/call/teardown),
+collection and session finish (where pytest-cov and pytest-html write
+their reports) becomes a span. Fixtures can mark finer phases with
+``suite_phase('webdriver.Chrome')``, which is a no-op when the plugin is
+off. At the end of the session the top cost centers are printed and the
+whole run is written as a Chrome trace (open in ``chrome://tracing`` or
+https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pytest
+
+
+_active = None  # SuiteProfiler of the current session, used by suite_phase()
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+@contextmanager
+def suite_phase(name, **args):
+    """Time a block of fixture/test code as its own span (no-op without ``--suite-profile``)."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    start = _now_us()
+    try:
+        yield
+    finally:
+        profiler.add_span('phase', name, start, _now_us(), args)
+
+
+class SuiteProfiler:
+    """Collects spans and aggregates them into cost centers."""
+
+    def __init__(self, config, output_file, top=15):
+        self.config = config
+        self.output_file = output_file
+        self.top = top
+        self.events = []
+        self.costs = defaultdict(lambda: {'count': 0, 'total_us': 0.0, 'max_us': 0.0})
+        self.worker = os.getenv('PYTEST_XDIST_WORKER', 'main')
+        self._fixture_teardown_started = {}
+        self._session_start = None
+
+    def add_span(self, category, name, start_us, end_us, args=None):
+        duration = end_us - start_us
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'ts': start_us, 'dur': duration,
+            'pid': os.getpid(), 'tid': threading.get_ident() if category == 'phase' else 0,
+            'args': args or {}
+        })
+        cost = self.costs[(category, name)]
+        cost['count'] += 1
+        cost['total_us'] += duration
+        cost['max_us'] = max(cost['max_us'], duration)
+
+    # Session and collection
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionstart(self, session):
+        self._session_start = _now_us()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_collection(self, session):
+        start = _now_us()
+        yield
+        self.add_span('collection', 'collection', start, _now_us())
+
+    # Tests
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        start = _now_us()
+        yield
+        self.add_span('test', item.nodeid, start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        start = _now_us()
+        yield
+        self.add_span('test setup', item.nodeid, start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        start = _now_us()
+        yield
+        self.add_span('test call', item.nodeid, start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        start = _now_us()
+        yield
+        self.add_span('test teardown', item.nodeid, start, _now_us())
+
+    # Fixtures: dependencies are set up before this hook runs, so spans do not nest
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = _now_us()
+        yield
+        self.add_span('fixture setup', fixturedef.argname, start, _now_us(), {'scope': fixturedef.scope})
+        # Finalizers run LIFO: this one runs first, right before the fixture's own teardown
+        key = id(fixturedef)
+        fixturedef.addfinalizer(lambda: self._fixture_teardown_started.__setitem__(key, _now_us()))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        start = self._fixture_teardown_started.pop(id(fixturedef), None)
+        if start is not None:
+            self.add_span('fixture teardown', fixturedef.argname, start, _now_us(), {'scope': fixturedef.scope})
+
+    # Reports written by other plugins (pytest-cov, pytest-html)
+
+    @pytest.hookimpl(hookwrapper=True, tryfirst=True)
+    def pytest_sessionfinish(self, session, exitstatus):
+        start = _now_us()
+        yield
+        self.add_span('session finish', 'pytest_sessionfinish', start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True, tryfirst=True)
+    def pytest_terminal_summary(self, terminalreporter, exitstatus, config):
+        start = _now_us()
+        yield
+        self.add_span('session finish', 'pytest_terminal_summary', start, _now_us())
+        # Last hook with a terminal: report now, the trace includes everything up to here
+        self.report(terminalreporter)
+
+    def ranked_costs(self):
+        rows = [
+            {'category': category, 'name': name, **cost}
+            for (category, name), cost in self.costs.items()
+            if category != 'test'  # whole-test spans overlap their phases
+        ]
+        rows.sort(key=lambda row: row['total_us'], reverse=True)
+        return rows
+
+    def report(self, terminalreporter):
+        session_us = _now_us() - (self._session_start or _now_us())
+        coverage = bool(getattr(self.config.option, 'cov_source', None))
+        write = terminalreporter.write_line
+        terminalreporter.section(f"suite profile (top {self.top} cost centers)")
+        write(f"Session: {session_us / 1e6:.1f}s, coverage {'on' if coverage else 'off'}, worker {self.worker}")
+        write(f"{'Total s':>9} {'Share':>6} {'Count':>6} {'Mean ms':>9} {'Max ms':>9}  Cost center")
+        for row in self.ranked_costs()[:self.top]:
+            write(
+                f"{row['total_us'] / 1e6:>9.2f} {100 * row['total_us'] / session_us if session_us else 0:>5.1f}% "
+                f"{row['count']:>6} {row['total_us'] / row['count'] / 1000:>9.1f} {row['max_us'] / 1000:>9.1f}  "
+                f"{row['category']}: {row['name']}"
+            )
+        path = self.write_trace(session_us)
+        write(f"Chrome trace: {path}")
+
+    def write_trace(self, session_us):
+        output_file = self.output_file
+        if self.worker != 'main':
+            root, ext = os.path.splitext(output_file)
+            output_file = f"{root}-{self.worker}{ext}"
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        metadata = [
+            {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': f"pytest ({self.worker})"}},
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0, 'args': {'name': 'suite'}}
+        ]
+        session = []
+        if self._session_start is not None:
+            session.append({'name': 'session', 'cat': 'session', 'ph': 'X', 'ts': self._session_start,
+                            'dur': session_us, 'pid': os.getpid(), 'tid': 0, 'args': {}})
+        with open(output_file, 'w') as trace_file:
+            json.dump({
+                'traceEvents': metadata + session + self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'costCenters': self.ranked_costs()}
+            }, trace_file)
+        return output_file
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('suite-profile', 'timing of the test suite itself')
+    group.addoption('--suite-profile', nargs='?', const=os.path.join('reports', 'suite-trace.json'),
+                    default=None, metavar='TRACE_FILE',
+                    help='Time fixtures and test phases; write a Chrome trace (default: reports/suite-trace.json)')
+    group.addoption('--suite-profile-top', type=int, default=15, help='Cost centers to print (default: 15)')
+
+
+def pytest_configure(config):
+    global _active
+    output_file = config.getoption('suite_profile')
+    if output_file:
+        _active = SuiteProfiler(config, output_file, config.getoption('suite_profile_top'))
+        config.pluginmanager.register(_active, 'suite_profiler')
+
+
+def pytest_unconfigure(config):
+    global _active
+    if _active is not None:
+        config.pluginmanager.unregister(_active)
+        _active = None
@@ -112,6 +112,9 @@ class BrowserHelpers:
             # Filter for network errors
             network_errors = []
             for log in logs:
+                # Substring check first: json.loads on every performance log entry dominates this call
+                if 'Network.loadingFailed' not in log['message']:
+                    continue
                 message = json.loads(log['message'])
                 if (message.get('message', {}).get('method') == 'Network.loadingFailed'):
                     network_errors.append(message)
@@ -138,6 +141,26 @@ class BrowserHelpers:
             return None
 
 
+class RoundTripCounter:
+    """Counts WebDriver commands (HTTP round trips to chromedriver) issued by a test."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self.by_command = {}
+        self._original_execute = driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.count += 1
+            self.by_command[driver_command] = self.by_command.get(driver_command, 0) + 1
+            return self._original_execute(driver_command, params)
+
+        driver.execute = counting_execute
+
+    def uninstall(self):
+        self.driver.execute = self._original_execute
+
+
 class MemoryTestHelpers:
     """Helpers for memory testing."""
     
@@ -184,6 +207,50 @@ class MemoryTestHelpers:
             'time_delta': after.get('timestamp', 0) - before.get('timestamp', 0)
         }
     
+    @staticmethod
+    def _browser_processes(driver):
+        """chromedriver and every Chrome process under it (browser, renderers, out-of-process iframes)."""
+        import psutil
+
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            return [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+
+    @staticmethod
+    def get_browser_rss_mb(driver):
+        """Resident memory of the whole Chrome process tree."""
+        import psutil
+
+        processes = MemoryTestHelpers._browser_processes(driver)
+        if processes is None:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue  # Process exited between listing and sampling
+        return total / 1024 / 1024
+
+    @staticmethod
+    def get_browser_cpu_seconds(driver):
+        """User + system CPU time consumed so far by the Chrome process tree."""
+        import psutil
+
+        processes = MemoryTestHelpers._browser_processes(driver)
+        if processes is None:
+            return None
+        total = 0.0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                continue
+        return total
+
     @staticmethod
     def force_garbage_collection(driver):
         """Force garbage collection if available."""
@@ -202,10 +269,11 @@ class ReportHelpers:
     """Helpers for generating test reports."""
     
     @staticmethod
-    def create_performance_report(test_results, output_file='performance_report.json'):
+    def create_performance_report(test_results, output_file='performance_report.json', metadata=None):
         """Create performance test report."""
         report = {
             'timestamp': time.time(),
+            **(metadata or {}),
             'test_results': test_results,
             'summary': {
                 'total_tests': len(test_results),
@@ -233,3 +301,33 @@ class ReportHelpers:
             else:
                 print(f"{key}: {value}")
         print("" + "=" * (len(test_name) + 12))
+
+
+class PerformanceRecorder:
+    """Collects per-test performance metrics for the per-profile report."""
+
+    def __init__(self, node, budgets, results):
+        self.node = node
+        self.budgets = budgets
+        self.device_profile = budgets.device_profile
+        self.results = results
+
+    def budget(self, key, scaled=None):
+        """Threshold from ``PERFORMANCE_THRESHOLDS``, calibrated for this machine and device profile."""
+        return self.budgets.get(key, scaled)
+
+    def record(self, metric, value, unit='s', budget=None):
+        """Record a metric value, optionally against its budget."""
+        result = {
+            'test': self.node.nodeid,
+            'profile': self.device_profile['name'],
+            'metric': metric,
+            'value': value,
+            'unit': unit,
+            'budget': budget,
+            'passed': budget is None or value < budget
+        }
+        self.results.append(result)
+        self.node.user_properties.append((metric, value))
+        print(f"[{self.device_profile['name']}] {metric}: {value:.2f}{unit}")
+        return result
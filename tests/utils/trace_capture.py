@@ -0,0 +1,278 @@
+"""Per-test Chrome performance traces with bounded storage.
+
+With ``run_tests.py --trace`` (pytest ``--chrome-trace``) every browser test
+is recorded with CDP ``Tracing.start``. The browser compresses the trace
+(``streamCompression: gzip``) and hands back a stream that is copied to
+disk chunk by chunk with ``IO.read``, so a trace never sits in Python
+memory. After the test:
+
+- ``summarize_trace`` extracts GC pauses, long tasks and network
+  waterfall totals (streaming the gzip file through ``JsonStreamReader``);
+  the summary of every test goes to ``summary.json``;
+- the raw trace is kept only when the test failed or regressed (its call
+  phase was much slower than its recent history), and ``TraceRetention``
+  prunes the oldest traces beyond the size cap.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import os
+import statistics
+import time
+
+from tests.utils.json_stream import JsonStreamReader
+
+
+TRACE_CATEGORIES = [
+    '-*',
+    'devtools.timeline',
+    'disabled-by-default-devtools.timeline',
+    'disabled-by-default-devtools.timeline.frame',
+    'v8.execute',
+    'disabled-by-default-v8.gc',
+    'blink.user_timing',
+    'loading'
+]
+IO_READ_CHUNK = 1 << 20
+LONG_TASK_MS = 50
+GC_EVENTS = ('MajorGC', 'MinorGC', 'V8.GCFinalizeMC', 'V8.GCScavenger', 'V8.GCIncrementalMarking')
+TOP_LEVEL_TASKS = ('RunTask', 'ThreadControllerImpl::RunTask')
+
+
+class TraceRecorder:
+    """Tracing.start/end on a ``BackgroundCDP`` session, streaming the result to a file."""
+
+    def __init__(self, cdp, categories=None):
+        self.cdp = cdp
+        self.categories = categories or TRACE_CATEGORIES
+        self.recording = False
+
+    def start(self):
+        self.cdp.send('Tracing.start', {
+            'transferMode': 'ReturnAsStream',
+            'streamFormat': 'json',
+            'streamCompression': 'gzip',
+            'traceConfig': {
+                'recordMode': 'recordAsMuchAsPossible',
+                'includedCategories': [c for c in self.categories if not c.startswith('-')],
+                'excludedCategories': [c[1:] for c in self.categories if c.startswith('-')]
+            }
+        })
+        self.recording = True
+        return self
+
+    def stop(self, path, timeout=120):
+        """End tracing and write the gzip trace to ``path``; returns the file size in bytes."""
+        if not self.recording:
+            return 0
+        self.recording = False
+        client = self.cdp.client
+
+        async def drain():
+            completed = asyncio.get_running_loop().create_future()
+            unsubscribe = client.subscribe(
+                'Tracing.tracingComplete', lambda params: completed.done() or completed.set_result(params)
+            )
+            try:
+                await client.send('Tracing.end')
+                params = await asyncio.wait_for(completed, timeout)
+            finally:
+                unsubscribe()
+            handle = params['stream']
+            compressed = params.get('streamCompression', 'none') == 'gzip'
+            with open(path, 'wb') as raw_file:
+                sink = raw_file if compressed else gzip.GzipFile(fileobj=raw_file, mode='wb')
+                try:
+                    while True:
+                        chunk = await client.send('IO.read', {'handle': handle, 'size': IO_READ_CHUNK})
+                        data = chunk.get('data', '')
+                        sink.write(base64.b64decode(data) if chunk.get('base64Encoded') else data.encode())
+                        if chunk.get('eof'):
+                            break
+                finally:
+                    if sink is not raw_file:
+                        sink.close()
+            await client.send('IO.close', {'handle': handle})
+            return os.path.getsize(path)
+
+        return self.cdp.run(drain(), timeout=timeout + 60)
+
+
+def iter_trace_events(path):
+    """Stream the events of a (gzip) trace file without loading it whole."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as trace_file:
+        reader = JsonStreamReader(trace_file)
+        if reader.peek() == '[':
+            yield from reader.iter_array()
+            return
+        for key in reader.iter_object_keys():
+            if key == 'traceEvents':
+                yield from reader.iter_array()
+            else:
+                reader.skip_value()
+
+
+def _summary_entry():
+    return {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+
+
+def _add(entry, duration_ms):
+    entry['count'] += 1
+    entry['total_ms'] += duration_ms
+    entry['max_ms'] = max(entry['max_ms'], duration_ms)
+
+
+def summarize_trace(path):
+    """GC pauses, long tasks on the renderer main thread and network waterfall totals."""
+    main_threads = set()
+    gc, long_tasks, tasks = _summary_entry(), _summary_entry(), []
+    requests = {}
+    frames = 0
+
+    for event in iter_trace_events(path):
+        name = event.get('name')
+        phase = event.get('ph')
+        if phase == 'M':
+            if name == 'thread_name' and event.get('args', {}).get('name') == 'CrRendererMain':
+                main_threads.add((event.get('pid'), event.get('tid')))
+            continue
+        duration_ms = event.get('dur', 0) / 1000
+        if name in GC_EVENTS and phase == 'X':
+            _add(gc, duration_ms)
+        elif name in TOP_LEVEL_TASKS and phase == 'X' and duration_ms >= LONG_TASK_MS:
+            tasks.append(((event.get('pid'), event.get('tid')), duration_ms))
+        elif name == 'DrawFrame':
+            frames += 1
+        elif name in ('ResourceSendRequest', 'ResourceReceiveResponse', 'ResourceFinish'):
+            data = event.get('args', {}).get('data', {})
+            request = requests.setdefault(data.get('requestId'), {})
+            if name == 'ResourceSendRequest':
+                request['start'] = event.get('ts', 0)
+                request['url'] = data.get('url', '')
+            elif name == 'ResourceFinish':
+                request['end'] = event.get('ts', 0)
+                request['bytes'] = data.get('encodedDataLength', 0)
+                request['failed'] = bool(data.get('didFail'))
+
+    for thread, duration_ms in tasks:
+        if not main_threads or thread in main_threads:
+            _add(long_tasks, duration_ms)
+
+    finished = [r for r in requests.values() if 'start' in r and 'end' in r]
+    starts = [r['start'] for r in finished]
+    ends = [r['end'] for r in finished]
+    return {
+        'gc': gc,
+        'long_tasks': long_tasks,
+        'frames': frames,
+        'network': {
+            'requests': len(requests),
+            'finished': len(finished),
+            'failed': sum(1 for r in finished if r.get('failed')),
+            'bytes': sum(r.get('bytes', 0) for r in finished),
+            'busy_ms': sum(r['end'] - r['start'] for r in finished) / 1000,
+            'waterfall_ms': (max(ends) - min(starts)) / 1000 if finished else 0.0
+        }
+    }
+
+
+class TraceRetention:
+    """Keeps traces of failed/regressed tests under a total size cap; tracks call durations."""
+
+    def __init__(self, directory, max_total_mb=500, regression_factor=1.5, history=10):
+        self.directory = directory
+        self.max_total_bytes = max_total_mb * 1024 * 1024
+        self.regression_factor = regression_factor
+        self.history = history
+        self.index_file = os.path.join(directory, 'durations.json')
+        self.summary_file = os.path.join(directory, 'summary.json')
+        os.makedirs(directory, exist_ok=True)
+        self.durations = self._load(self.index_file)
+        self.summaries = {}
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path) as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return {}
+
+    def trace_path(self, nodeid):
+        safe = ''.join(c if c.isalnum() or c in '._-' else '_' for c in nodeid).strip('_')[:150]
+        return os.path.join(self.directory, f"{safe}.{int(time.time())}.json.gz")
+
+    def is_regression(self, nodeid, duration):
+        """Slower than ``regression_factor`` x the median of the last runs (needs 3 of them)."""
+        previous = self.durations.get(nodeid, [])
+        return len(previous) >= 3 and duration > self.regression_factor * statistics.median(previous)
+
+    def record(self, nodeid, path, failed, duration, summary):
+        """Decide whether the trace at ``path`` is kept; returns the reason or None."""
+        regressed = duration is not None and self.is_regression(nodeid, duration)
+        reason = 'failed' if failed else ('regressed' if regressed else None)
+        if duration is not None and not failed:
+            self.durations[nodeid] = (self.durations.get(nodeid, []) + [duration])[-self.history:]
+        self.summaries[nodeid] = {'kept': reason, 'trace': path if reason else None,
+                                  'duration': duration, **summary}
+        if reason:
+            self.prune()
+        elif os.path.exists(path):
+            os.remove(path)
+        return reason
+
+    def prune(self):
+        """Delete the oldest traces until the directory fits the size cap."""
+        traces = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                  if name.endswith('.json.gz')]
+        traces.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in traces)
+        while traces and total > self.max_total_bytes:
+            oldest = traces.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+
+    def save(self):
+        with open(self.index_file, 'w') as index_file:
+            json.dump(self.durations, index_file, indent=2)
+        summaries = {**self._load(self.summary_file), **self.summaries}
+        with open(self.summary_file, 'w') as summary_file:
+            json.dump(summaries, summary_file, indent=2)
+
+
+class PerTestTrace:
+    """Traces one browser test; ``finish`` summarizes it and applies the retention policy."""
+
+    def __init__(self, driver, retention):
+        self.driver = driver
+        self.retention = retention
+        self.cdp = None
+        self.recorder = None
+
+    def start(self):
+        from tests.utils.cdp_client import BackgroundCDP  # needs the optional websockets package
+
+        self.cdp = BackgroundCDP(self.driver).start()
+        self.recorder = TraceRecorder(self.cdp).start()
+        return self
+
+    def finish(self, node):
+        """Stop tracing for ``node`` (reports from the makereport hook are on ``node.rep_*``)."""
+        try:
+            path = self.retention.trace_path(node.nodeid)
+            self.recorder.stop(path)
+            summary = summarize_trace(path)
+            reports = [getattr(node, f"rep_{when}", None) for when in ('setup', 'call')]
+            failed = any(report is not None and report.failed for report in reports)
+            duration = reports[1].duration if reports[1] is not None else None
+            reason = self.retention.record(node.nodeid, path, failed, duration, summary)
+            node.user_properties.append(('trace_long_task_ms', round(summary['long_tasks']['total_ms'], 1)))
+            node.user_properties.append(('trace_gc_ms', round(summary['gc']['total_ms'], 1)))
+            if reason:
+                node.user_properties.append(('trace', path))
+            return summary
+        finally:
+            self.cdp.stop()